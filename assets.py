@@ -0,0 +1,121 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+
+def safe_load_image(path, fallback_size=(50, 50)):
+    """Return image as BGRA (with alpha). If missing, return colored placeholder BGRA."""
+    if not os.path.exists(path):
+        w, h = fallback_size
+        placeholder = np.zeros((h, w, 4), dtype=np.uint8)
+        # create visible placeholder (light gray with full alpha)
+        placeholder[..., :3] = 200
+        placeholder[..., 3] = 255
+        print(f"[WARNING] Image not found: {path} -> using placeholder")
+        return placeholder
+    img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        w, h = fallback_size
+        placeholder = np.zeros((h, w, 4), dtype=np.uint8)
+        placeholder[..., :3] = 200
+        placeholder[..., 3] = 255
+        print(f"[WARNING] Failed to read image: {path} -> using placeholder")
+        return placeholder
+    # If image has no alpha (3 channels), convert to BGRA
+    if img.ndim == 3 and img.shape[2] == 3:
+        b, g, r = cv2.split(img)
+        a = np.full(b.shape, 255, dtype=b.dtype)
+        img = cv2.merge((b, g, r, a))
+    elif img.ndim == 2:
+        # grayscale -> convert to BGRA
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGRA)
+    return img
+
+
+def safe_load_sound(path):
+    import pygame
+    if not os.path.exists(path):
+        print(f"[WARNING] Sound not found: {path}")
+        return None
+    try:
+        return pygame.mixer.Sound(path)
+    except Exception as e:
+        print(f"[WARNING] Failed to load sound {path}: {e}")
+        return None
+
+
+class Sprite:
+    """A BGRA image plus its blend-ready form: premultiplied color and alpha in 0..1.
+
+    All three arrays are read-only because the same Sprite is shared by
+    every game that asks for it.
+    """
+
+    def __init__(self, image):
+        alpha = image[..., 3:4].astype(np.float32) / 255.0
+        self.image = image
+        self.color = image[..., :3].astype(np.float32) * alpha
+        self.alpha = alpha
+        for array in (self.image, self.color, self.alpha):
+            array.flags.writeable = False
+
+    @property
+    def shape(self):
+        return self.image.shape
+
+
+class _Entry:
+    def __init__(self):
+        self.ready = threading.Event()
+        self.value = None
+
+
+class AssetCache:
+    """Process-wide cache of decoded images and sounds.
+
+    Each (path, size) is loaded once, however many games or levels ask for
+    it; a request for an asset that another thread is still loading waits
+    for that load instead of decoding it again.
+    """
+
+    def __init__(self):
+        self.loads = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _get(self, key, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = _Entry()
+            else:
+                self.hits += 1
+        if owner:
+            try:
+                entry.value = loader()
+            finally:
+                self.loads += 1
+                entry.ready.set()
+        else:
+            entry.ready.wait()
+        return entry.value
+
+    def sprite(self, path, size=None, fallback_size=(50, 50)):
+        """Sprite for the image at `path`, resized to `size` (w, h) if given."""
+        def load():
+            image = safe_load_image(path, fallback_size=size or fallback_size)
+            if size is not None and (image.shape[1], image.shape[0]) != tuple(size):
+                image = cv2.resize(image, tuple(size), interpolation=cv2.INTER_AREA)
+            return Sprite(image)
+        return self._get(("image", path, size), load)
+
+    def sound(self, path):
+        """pygame Sound for `path`, or None if it is missing or the mixer is unavailable."""
+        return self._get(("sound", path), lambda: safe_load_sound(path))
+
+
+asset_cache = AssetCache()
@@ -0,0 +1,158 @@
+import queue
+import threading
+import time
+
+import pygame
+
+
+class AudioPlayer:
+    """Plays sound effects and drives background music from a worker thread.
+
+    The game loop only calls play(name) / music(state), which queue an event
+    and return immediately; a full queue drops the event rather than block.
+    The worker plays each sound on a free channel from a fixed pool (stealing
+    the one that started longest ago when all are busy), collapses repeats of
+    the same sound within one batch, and ignores repeats arriving sooner than
+    that sound's `min_interval`. Sounds registered as `exclusive` get their own
+    channel and cut off their previous play (e.g. menu hover ticks).
+    Mixer errors are reported once per kind and never reach the caller.
+    """
+
+    def __init__(self, first_channel=0, channels=8, max_pending=32, min_interval=0.05):
+        self.enabled = bool(pygame.mixer.get_init())
+        self.min_interval = min_interval
+        self.played = 0
+        self.dropped = 0
+        self.limited = 0
+
+        self._sounds = {}           # name -> (Sound, min_interval, exclusive)
+        self._last_played = {}
+        self._music_state = None
+        self._warned = set()
+        self._pool = []
+        self._started = []          # start time of the sound on each pool channel
+        self._exclusive = {}        # name -> dedicated Channel
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        if not self.enabled:
+            return
+        try:
+            total = first_channel + channels
+            if pygame.mixer.get_num_channels() < total:
+                pygame.mixer.set_num_channels(total)
+            self._pool = [pygame.mixer.Channel(first_channel + i) for i in range(channels)]
+            self._started = [0.0] * channels
+        except Exception as e:
+            print("[WARNING] Could not set up audio channels:", e)
+            self.enabled = False
+            return
+        self._thread = threading.Thread(target=self._run, name="AudioPlayer", daemon=True)
+        self._thread.start()
+
+    def register(self, name, sound, min_interval=None, exclusive=False):
+        """Make `sound` playable as `name`. A None sound (failed load) is ignored."""
+        if sound is None:
+            return
+        self._sounds[name] = (sound, self.min_interval if min_interval is None else min_interval, exclusive)
+        if exclusive and self._pool:
+            # take the channel off the shared pool
+            self._exclusive[name] = self._pool.pop()
+            self._started.pop()
+
+    # -- called from the game loop ----------------------------------------
+    def play(self, name):
+        if self.enabled and name in self._sounds:
+            self._post(("play", name))
+
+    def stop(self, name):
+        if self.enabled and name in self._exclusive:
+            self._post(("stop", name))
+
+    def music(self, state):
+        """Switch background music to `state`; repeating the current state is a no-op."""
+        if not self.enabled or state == self._music_state:
+            return
+        self._music_state = state
+        self._post(("music", state))
+
+    def _post(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    # -- worker -------------------------------------------------------------
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # drain whatever else is already waiting so duplicates collapse
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            seen = set()
+            for event in batch:
+                if event is None:
+                    return
+                if event[0] == "play":
+                    if event in seen:
+                        continue
+                    seen.add(event)
+                self._handle(*event)
+
+    def _handle(self, kind, arg):
+        try:
+            if kind == "play":
+                self._play(arg)
+            elif kind == "stop":
+                self._exclusive[arg].stop()
+            elif kind == "music":
+                self._set_music(arg)
+        except Exception as e:
+            self._warn(kind, e)
+
+    def _play(self, name):
+        sound, min_interval, _ = self._sounds[name]
+        now = time.time()
+        if now - self._last_played.get(name, 0.0) < min_interval:
+            self.limited += 1
+            return
+        self._last_played[name] = now
+        channel = self._exclusive.get(name)
+        if channel is None:
+            if not self._pool:
+                return
+            idx = next((i for i, c in enumerate(self._pool) if not c.get_busy()), None)
+            if idx is None:
+                idx = min(range(len(self._pool)), key=self._started.__getitem__)
+            channel = self._pool[idx]
+            self._started[idx] = now
+        channel.play(sound)
+        self.played += 1
+
+    @staticmethod
+    def _set_music(state):
+        if state == "play":
+            pygame.mixer.music.play(-1)
+        elif state == "pause":
+            pygame.mixer.music.pause()
+        elif state == "resume":
+            pygame.mixer.music.unpause()
+        elif state == "stop":
+            pygame.mixer.music.stop()
+
+    def _warn(self, kind, error):
+        if kind not in self._warned:
+            self._warned.add(kind)
+            print(f"[WARNING] Audio {kind} failed:", error)
+
+    def close(self):
+        if self._thread is not None:
+            self.music("stop")
+            try:
+                self._queue.put(None, timeout=0.5)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=1.0)
+            self._thread = None
@@ -0,0 +1,378 @@
+"""Benchmarks for the game and vision hot paths.
+
+    python benchmarks/run.py                          # run all, print a table
+    python benchmarks/run.py --out bench.json         # also save machine-readable results
+    python benchmarks/run.py --compare baseline.json  # flag regressions (exit code 1)
+    python benchmarks/run.py -k placement             # only benchmarks whose name contains "placement"
+    python benchmarks/run.py --replay session.hsrec   # frame pipeline on recorded camera frames
+
+Inputs are fixed: the frame is the 1280x720 gameplay screenshot in
+"Game Images", the fingertip path is benchmarks/fixtures/fingertips.json, and
+every game is seeded, so runs on the same machine are comparable.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from capture import FramePool  # noqa: E402
+from game import SnakeGameClass, FOOD_PATH_DEFAULT, IMAGES_DIR, text_cache  # noqa: E402
+from headless import ManualClock  # noqa: E402
+from multisnake import MultiSnakeGame  # noqa: E402
+from output import OutputFanout, FrameSink  # noqa: E402
+from rendering import LayerCompositor  # noqa: E402
+from replay import ReplayCapture  # noqa: E402
+from spatial import RectGrid  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FINGERTIPS_FIXTURE = os.path.join(FIXTURES_DIR, "fingertips.json")
+FRAME_FIXTURE = os.path.join(IMAGES_DIR, "Snake Game.png")
+
+BENCHMARKS = []
+REPLAY_PATH = None      # set by --replay: feed the frame pipeline from a recording
+
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return register
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+def make_fingertips(n=900, seed=0):
+    """Smooth wandering fingertip path used to (re)generate the stored fixture."""
+    rng = random.Random(seed)
+    points = []
+    for i in range(n):
+        t = i / 30.0
+        x = 640 + 420 * math.sin(0.7 * t) + 60 * math.sin(3.1 * t) + rng.uniform(-4, 4)
+        y = 360 + 240 * math.sin(1.1 * t + 0.5) + 40 * math.cos(2.3 * t) + rng.uniform(-4, 4)
+        points.append([int(x), int(y)])
+    return points
+
+
+def load_fingertips():
+    with open(FINGERTIPS_FIXTURE, "r") as f:
+        return json.load(f)
+
+
+def load_frame():
+    frame = cv2.imread(FRAME_FIXTURE)
+    if frame is None:
+        raise SystemExit(f"Frame fixture missing: {FRAME_FIXTURE}")
+    return cv2.resize(frame, (1280, 720))
+
+
+def make_game(level=1, body_length=None, seed=0):
+    game = SnakeGameClass(FOOD_PATH_DEFAULT, level, clock=ManualClock(100.0), rng=random.Random(seed),
+                          persist=False)
+    if body_length:
+        # lay a spiral body of roughly `body_length` pixels
+        game.body.clear()
+        x, y, total, i = 640, 360, 0.0, 0
+        while total < body_length:
+            r = 40 + i * 0.35
+            nx, ny = 640 + r * math.cos(i * 0.15), 360 + r * math.sin(i * 0.15) * 0.55
+            step = math.hypot(nx - x, ny - y)
+            game.body.append(int(nx), int(ny), step)
+            x, y, total, i = nx, ny, total + step, i + 1
+        game.allowedLength = total
+        game.previousHead = (int(x), int(y))
+        game.score = 7      # enables self-collision checks
+    # the clock never moves, so put the spawn grace period behind it: otherwise
+    # every step would skip wall, self-collision and inactivity checks
+    game.startTime = -1e9
+    return game
+
+
+def wall_rects(n, seed=0, size=75):
+    rng = random.Random(seed)
+    return [(x, y, x + size, y + size) for x, y in
+            ((rng.randint(0, 1280 - size), rng.randint(0, 720 - size)) for _ in range(n))]
+
+
+# -------------------------
+# Benchmarks
+# -------------------------
+def _snake_update(body_length):
+    def setup():
+        game = make_game(level=0, body_length=body_length)
+        tips = load_fingertips()
+        state = {"i": 0}
+
+        def step():
+            game.gameOver = False
+            game.update(None, tips[state["i"] % len(tips)])
+            state["i"] += 1
+        return step
+    return setup
+
+
+for _length in (150, 1500, 6000):
+    benchmark(f"snake_update[len={_length}]")(_snake_update(_length))
+
+
+def _multi_snake_step(players):
+    def setup():
+        game = MultiSnakeGame(FOOD_PATH_DEFAULT, 3, players=players, clock=ManualClock(100.0),
+                              rng=random.Random(0), persist=False)
+        game.snakes.allowed[:] = 1500
+        game.snakes.start_time[:] = -1e9     # past the spawn grace period, so collisions are checked
+        tips = load_fingertips()
+        state = {"i": 0}
+
+        def step():
+            i = state["i"]
+            game.snakes.over[:] = False
+            # players follow the same path at different offsets along it
+            game.step([tips[(i + 97 * p) % len(tips)] for p in range(players)])
+            state["i"] += 1
+        return step
+    return setup
+
+
+for _players in (1, 2, 4):
+    benchmark(f"multi_snake_step[players={_players}]")(_multi_snake_step(_players))
+
+
+def _render_body(body_length):
+    def setup():
+        game = make_game(level=0, body_length=body_length)
+        frame = load_frame()
+        canvas = frame.copy()
+        points = game.body.points()
+
+        def step():
+            game.renderer.draw(canvas, points)
+        return step
+    return setup
+
+
+for _length in (150, 1500, 6000):
+    benchmark(f"render_body[len={_length}]")(_render_body(_length))
+
+
+def _wall_collision(n):
+    def setup():
+        grid = RectGrid(cell_size=75)
+        for i, rect in enumerate(wall_rects(n)):
+            grid.insert(i, rect)
+        tips = load_fingertips()
+        state = {"i": 0}
+
+        def step():
+            x, y = tips[state["i"] % len(tips)]
+            grid.hit(x, y)
+            state["i"] += 1
+        return step
+    return setup
+
+
+for _walls in (12, 100, 500):
+    benchmark(f"wall_collision[walls={_walls}]")(_wall_collision(_walls))
+
+
+@benchmark("placement[food+body]")
+def _food_placement():
+    game = make_game(level=6, body_length=1500)
+
+    def step():
+        game.randomFoodLocation()
+    return step
+
+
+@benchmark("placement[obstacle]")
+def _obstacle_placement():
+    game = make_game(level=6, body_length=1500)
+
+    def step():
+        game.obstacles = []
+        game.spawnObstacle()
+        for pos in game.obstacles:
+            game.removeBlock(("obstacle", pos))
+    return step
+
+
+@benchmark("placement[walls level=6]")
+def _wall_placement():
+    game = make_game(level=6)
+
+    def step():
+        game.generate_permanent_walls()
+    return step
+
+
+def _overlay(n):
+    def setup():
+        game = make_game(level=1)
+        frame = load_frame()
+        layers = LayerCompositor()
+        sprites = [(game.imgWall, (x0, y0)) for x0, y0, _, _ in wall_rects(n)]
+        layers.build(n, frame.shape, sprites)
+        canvas = frame.copy()
+
+        def step():
+            layers.blend(canvas)
+        return step
+    return setup
+
+
+for _walls in (12, 100):
+    benchmark(f"overlay[walls={_walls}]")(_overlay(_walls))
+
+
+@benchmark("text[hud]")
+def _text_hud():
+    canvas = load_frame()
+    state = {"i": 0}
+
+    def step():
+        # score changes every 30 frames, like a fast player
+        score = state["i"] // 30
+        text_cache.putTextRect(canvas, f'Score: {score}', [50, 50], scale=2, thickness=2, offset=5)
+        text_cache.putTextRect(canvas, f'High Score: {score}', [50, 100], scale=2, thickness=2, offset=5)
+        text_cache.putTextRect(canvas, 'Level: 3', [50, 150], scale=2, thickness=2, offset=5)
+        state["i"] += 1
+    return step
+
+
+@benchmark("frame_pipeline[level=3]")
+def _frame_pipeline():
+    """Flip + game update + draw on the fixture frame (hand detection excluded)."""
+    game = make_game(level=3, body_length=800)
+    frame = load_frame()
+    replay = ReplayCapture(REPLAY_PATH, realtime=False, loop=True) if REPLAY_PATH else None
+    tips = load_fingertips()
+    display = np.empty_like(frame)
+    state = {"i": 0}
+
+    def step():
+        img = cv2.flip(replay.read()[1] if replay else frame, 1, dst=display)
+        game.gameOver = False
+        game.update(img, tips[state["i"] % len(tips)])
+        state["i"] += 1
+    return step
+
+
+class _NullSink(FrameSink):
+    name = "null"
+
+    def write(self, frame, timestamp):
+        pass
+
+
+@benchmark("output_publish[sinks=2]")
+def _output_publish():
+    """Handing a finished frame to two sinks (what the game loop pays; encoding is off-thread)."""
+    frame = load_frame()
+    pool = FramePool(frame.shape)
+    outputs = OutputFanout([_NullSink(), _NullSink()])
+    state = {"t": 0.0}
+
+    def step():
+        state["t"] += 1 / 30
+        outputs.publish(pool.next(), state["t"], pool)
+    return step
+
+
+# -------------------------
+# Runner
+# -------------------------
+def measure(step, min_time=0.3, repeats=5):
+    """Median / min microseconds per call over `repeats` timed batches."""
+    step()      # warm caches
+    number, elapsed = 1, 0.0
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            step()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeats or number >= 1 << 20:
+            break
+        number *= 2
+    runs = [elapsed / number]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            step()
+        runs.append((time.perf_counter() - start) / number)
+    runs = sorted(r * 1e6 for r in runs)
+    return {"median_us": round(runs[len(runs) // 2], 3), "min_us": round(runs[0], 3), "calls": number * repeats}
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        ratio = current["median_us"] / base["median_us"] if base["median_us"] else float("inf")
+        current["baseline_us"] = base["median_us"]
+        current["ratio"] = round(ratio, 3)
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HOLOSNAKE hot-path benchmarks.")
+    parser.add_argument("-k", dest="keyword", help="only run benchmarks whose name contains this")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --out run")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging (0.15 = 15%%)")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds spent per benchmark")
+    parser.add_argument("--replay", help="recording (HOLOSNAKE_RECORD file) to feed the frame pipeline")
+    parser.add_argument("--make-fixtures", action="store_true", help="regenerate the fingertip fixture and exit")
+    args = parser.parse_args()
+
+    if args.make_fixtures:
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        with open(FINGERTIPS_FIXTURE, "w") as f:
+            json.dump(make_fingertips(), f)
+        print("Wrote", FINGERTIPS_FIXTURE)
+        return 0
+
+    global REPLAY_PATH
+    REPLAY_PATH = args.replay
+    cv2.setNumThreads(1)
+    results = {}
+    for name, setup in BENCHMARKS:
+        if args.keyword and args.keyword not in name:
+            continue
+        results[name] = measure(setup(), args.min_time)
+        print(f"{name:<32}{results[name]['median_us']:>12.1f} us")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print()
+        for name, r in results.items():
+            if "ratio" in r:
+                flag = "  REGRESSION" if name in regressions else ""
+                print(f"{name:<32}{r['baseline_us']:>12.1f} -> {r['median_us']:>10.1f} us  x{r['ratio']:.2f}{flag}")
+
+    if args.out:
+        meta = {"python": platform.python_version(), "numpy": np.__version__, "opencv": cv2.__version__,
+                "machine": platform.machine(), "platform": platform.platform(), "time": time.time()}
+        with open(args.out, "w") as f:
+            json.dump({"meta": meta, "results": results, "regressions": regressions}, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import threading
+import time
+
+import numpy as np
+
+
+class FrameGrabber:
+    """Reads camera frames on a background thread into a small ring of reused buffers.
+
+    The game loop asks for the latest frame with read(); frames the loop never
+    got to are dropped instead of queued, so a slow frame never lags behind the camera.
+    """
+
+    def __init__(self, cap, slots=3, max_failures=30, recorder=None):
+        # three slots is the minimum for lock-free triple buffering:
+        # one being written, one published, one held by the consumer
+        self.cap = cap
+        self.recorder = recorder
+        self.slots = [None] * max(3, slots)
+        self.times = [0.0] * len(self.slots)     # time.time() each slot's frame was captured
+        self.frame_time = 0.0                   # capture time of the frame last returned by read()
+        self.max_failures = max_failures
+
+        self.captured = 0
+        self.dropped = 0
+        self.consumed = 0
+        self.failed = False
+
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._latest = -1       # slot holding the newest published frame
+        self._held = -1         # slot handed out to the consumer
+        self._fresh = False     # latest frame not yet consumed
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+            self._thread.start()
+        return self
+
+    def _next_slot(self):
+        with self._lock:
+            for i in range(len(self.slots)):
+                if i != self._latest and i != self._held:
+                    return i
+        return 0
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            idx = self._next_slot()
+            try:
+                ok, frame = self.cap.read(self.slots[idx])
+            except Exception as e:
+                print("[WARNING] Camera read raised:", e)
+                ok, frame = False, None
+            if not ok or frame is None:
+                failures += 1
+                if failures >= self.max_failures:
+                    with self._lock:
+                        self.failed = True
+                        self._new_frame.notify_all()
+                    return
+                time.sleep(0.005)
+                continue
+            failures = 0
+            if self.recorder is not None:
+                self.recorder.write(frame)
+            with self._lock:
+                # cv2 hands back a fresh array when the slot shape does not match
+                self.slots[idx] = frame
+                self.times[idx] = time.time()
+                self.captured += 1
+                if self._fresh:
+                    self.dropped += 1
+                self._latest = idx
+                self._fresh = True
+                self._new_frame.notify_all()
+
+    def read(self, timeout=0.1):
+        """Return (success, frame) with the newest frame, waiting at most `timeout` for one.
+
+        If no new frame arrives in time the previous frame is returned again. The
+        array stays valid until the next read() call; copy it to keep it longer.
+        """
+        with self._lock:
+            if not self._fresh and not self.failed:
+                self._new_frame.wait(timeout)
+            if self._latest < 0:
+                return False, None
+            if self.failed and not self._fresh:
+                return False, None
+            if self._fresh:
+                self._fresh = False
+                self.consumed += 1
+            self._held = self._latest
+            self.frame_time = self.times[self._held]
+            return True, self.slots[self._held]
+
+    def stats(self):
+        with self._lock:
+            return {"captured": self.captured, "dropped": self.dropped, "consumed": self.consumed}
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+
+class FramePool:
+    """A ring of preallocated frame buffers, handed out round-robin.
+
+    A buffer returned by next() is reused `count` calls later unless it is
+    held: hold() lends it out (e.g. to an encoder job) and next() skips it
+    until every holder has called release(). When all buffers are held a new
+    one is added, so lending a frame never needs a copy.
+    """
+
+    def __init__(self, shape, count=2, dtype=np.uint8):
+        self.shape = shape
+        self.dtype = dtype
+        self.buffers = [np.empty(shape, dtype=dtype) for _ in range(count)]
+        self._holds = [0] * count
+        self._index = 0
+        self._lock = threading.Lock()
+
+    def _slot(self, buf):
+        return next((i for i, b in enumerate(self.buffers) if b is buf), None)
+
+    def hold(self, buf):
+        """Lend `buf` out; False if it is not one of this pool's buffers (nothing is held)."""
+        with self._lock:
+            i = self._slot(buf)
+            if i is None:
+                return False
+            self._holds[i] += 1
+            return True
+
+    def release(self, buf):
+        with self._lock:
+            i = self._slot(buf)
+            if i is not None:
+                self._holds[i] = max(self._holds[i] - 1, 0)
+
+    def next(self):
+        with self._lock:
+            n = len(self.buffers)
+            for step in range(n):
+                i = (self._index + step) % n
+                if not self._holds[i]:
+                    self._index = (i + 1) % n
+                    return self.buffers[i]
+            self.buffers.append(np.empty(self.shape, dtype=self.dtype))
+            self._holds.append(0)
+            self._index = 0
+            return self.buffers[-1]
@@ -0,0 +1,212 @@
+import math
+
+
+class HeadFilter:
+    """Base for fingertip filters: filter(point, t) -> smoothed (x, y) ints.
+
+    Subclasses implement _update(x, y, t) returning a smoothed position and
+    velocity (px/s); the base adds `lead` seconds of prediction along that
+    velocity, to cover capture and inference latency, and keeps a running
+    estimate of the lag the filter adds: how many seconds the output trails
+    the raw input along the direction of motion (negative when it leads).
+    """
+
+    name = "filter"
+
+    def __init__(self, lead=0.0):
+        self.lead = lead
+        self.lag = 0.0
+        self._last = None           # (x, y, t) of the previous raw input
+        self._raw_velocity = (0.0, 0.0)
+
+    def reset(self):
+        self._last = None
+        self._raw_velocity = (0.0, 0.0)
+        self.lag = 0.0
+
+    def params(self):
+        return {"lead": self.lead}
+
+    def describe(self):
+        parts = [self.name] + [f"{k}={v:g}" for k, v in self.params().items() if k != "lead"]
+        return " ".join(parts) + f" lead={self.lead * 1000:.0f}ms lag={self.lag * 1000:.0f}ms"
+
+    def __call__(self, point, t):
+        x, y = float(point[0]), float(point[1])
+        sx, sy, vx, vy = self._update(x, y, t)
+        ox, oy = sx + vx * self.lead, sy + vy * self.lead
+        self._measure_lag(x, y, ox, oy, t)
+        return int(ox), int(oy)
+
+    def _measure_lag(self, x, y, ox, oy, t):
+        last, self._last = self._last, (x, y, t)
+        if last is None or t <= last[2]:
+            return
+        dt = t - last[2]
+        # raw velocity, lightly averaged so detection jitter does not pass for motion
+        rvx, rvy = self._raw_velocity
+        rvx += 0.3 * ((x - last[0]) / dt - rvx)
+        rvy += 0.3 * ((y - last[1]) / dt - rvy)
+        self._raw_velocity = (rvx, rvy)
+        speed2 = rvx * rvx + rvy * rvy
+        if speed2 < 200.0 ** 2:
+            return      # too slow to tell lag from noise
+        sample = ((x - ox) * rvx + (y - oy) * rvy) / speed2
+        self.lag += 0.05 * (sample - self.lag)
+
+    def _update(self, x, y, t):
+        raise NotImplementedError
+
+
+class ExponentialFilter(HeadFilter):
+    """Fixed exponential average: the original 0.8 / 0.2 head smoothing."""
+
+    name = "exponential"
+
+    def __init__(self, alpha=0.2, lead=0.0):
+        super().__init__(lead)
+        self.alpha = alpha
+        self._state = None
+
+    def reset(self):
+        super().reset()
+        self._state = None
+
+    def params(self):
+        return {"alpha": self.alpha, "lead": self.lead}
+
+    def _update(self, x, y, t):
+        if self._state is None:
+            self._state = (x, y, t, 0.0, 0.0)
+            return x, y, 0.0, 0.0
+        px, py, pt, _, _ = self._state
+        # truncated like the original int() smoothing, so runs replay identically
+        sx = float(int((1 - self.alpha) * px + self.alpha * x))
+        sy = float(int((1 - self.alpha) * py + self.alpha * y))
+        dt = t - pt
+        vx, vy = ((sx - px) / dt, (sy - py) / dt) if dt > 0 else (0.0, 0.0)
+        self._state = (sx, sy, t, vx, vy)
+        return sx, sy, vx, vy
+
+
+def _smoothing(cutoff, dt):
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter(HeadFilter):
+    """One Euro filter (Casiez et al.): a low-pass whose cutoff rises with speed.
+
+    At rest the cutoff is `min_cutoff` Hz, which removes detection jitter;
+    moving fast raises it by `beta` Hz per px/s, so the lag shrinks exactly
+    when it would be noticed.
+    """
+
+    name = "one_euro"
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0, lead=0.0):
+        super().__init__(lead)
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._state = None
+
+    def reset(self):
+        super().reset()
+        self._state = None
+
+    def params(self):
+        return {"min_cutoff": self.min_cutoff, "beta": self.beta, "d_cutoff": self.d_cutoff, "lead": self.lead}
+
+    def _update(self, x, y, t):
+        if self._state is None:
+            self._state = (x, y, 0.0, 0.0, t)
+            return x, y, 0.0, 0.0
+        sx, sy, vx, vy, pt = self._state
+        dt = t - pt
+        if dt <= 0:
+            return sx, sy, vx, vy
+        a = _smoothing(self.d_cutoff, dt)
+        vx += a * ((x - sx) / dt - vx)
+        vy += a * ((y - sy) / dt - vy)
+        a = _smoothing(self.min_cutoff + self.beta * math.hypot(vx, vy), dt)
+        sx += a * (x - sx)
+        sy += a * (y - sy)
+        self._state = (sx, sy, vx, vy, t)
+        return sx, sy, vx, vy
+
+
+class KalmanFilter(HeadFilter):
+    """Constant-velocity Kalman filter, run independently on x and y.
+
+    `process_noise` is the acceleration variance (px/s^2)^2 the model allows
+    and `measurement_noise` the detection jitter variance (px^2). A sudden
+    change of direction shows up as large innovations, which the filter
+    follows within a few updates, while a still hand converges to a steady point.
+    """
+
+    name = "kalman"
+
+    def __init__(self, process_noise=5e5, measurement_noise=16.0, lead=0.0):
+        super().__init__(lead)
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self._axes = None
+        self._t = None
+
+    def reset(self):
+        super().reset()
+        self._axes = None
+        self._t = None
+
+    def params(self):
+        return {"process_noise": self.process_noise, "measurement_noise": self.measurement_noise,
+                "lead": self.lead}
+
+    def _step_axis(self, axis, z, dt):
+        # axis = [position, velocity, P00, P01, P11]
+        p, v, p00, p01, p11 = axis
+        q = self.process_noise
+        # predict
+        p += v * dt
+        p00 += dt * (2 * p01 + dt * p11) + q * dt ** 4 / 4
+        p01 += dt * p11 + q * dt ** 3 / 2
+        p11 += q * dt ** 2
+        # update with the measured position
+        s = p00 + self.measurement_noise
+        k0, k1 = p00 / s, p01 / s
+        r = z - p
+        p += k0 * r
+        v += k1 * r
+        p00, p01, p11 = (1 - k0) * p00, (1 - k0) * p01, p11 - k1 * p01
+        return [p, v, p00, p01, p11]
+
+    def _update(self, x, y, t):
+        if self._axes is None:
+            big = 1e6
+            self._axes = [[x, 0.0, self.measurement_noise, 0.0, big],
+                          [y, 0.0, self.measurement_noise, 0.0, big]]
+            self._t = t
+            return x, y, 0.0, 0.0
+        dt = t - self._t
+        if dt > 0:
+            self._t = t
+            self._axes = [self._step_axis(self._axes[0], x, dt), self._step_axis(self._axes[1], y, dt)]
+        (sx, vx, *_), (sy, vy, *_) = self._axes
+        return sx, sy, vx, vy
+
+
+HEAD_FILTERS = {
+    "exponential": ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def make_filter(name="one_euro", **params):
+    """Build a registered head filter by name."""
+    try:
+        cls = HEAD_FILTERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown head filter {name!r}; choose from {', '.join(HEAD_FILTERS)}")
+    return cls(**params)
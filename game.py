@@ -0,0 +1,310 @@
+import os
+import math
+import random
+import time
+from snake_body import SnakeBody
+from rendering import SnakeRenderer, LayerCompositor, TextSpriteCache
+from spatial import RectGrid, OccupancyMap
+from assets import asset_cache
+from filters import OneEuroFilter
+from scores import ScoreStore
+from levels import LevelCache
+
+# -------------------------
+# Paths & Utilities
+# -------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.path.join(BASE_DIR, "Game Images")
+SOUNDS_DIR = os.path.join(BASE_DIR, "Game Music")
+HIGHSCORE_FILE = os.path.join(BASE_DIR, "highscore.json")
+LEVELS_FILE = os.path.join(BASE_DIR, "levels.npz")
+FOOD_PATH_DEFAULT = os.path.join(IMAGES_DIR, "donut.png")
+WALL_PATH_DEFAULT = os.path.join(IMAGES_DIR, "wall.png")
+FOOD_SIZE = (75, 75)            # on-screen sprite sizes (w, h); art is resized once on load
+WALL_SIZE = (75, 75)
+
+# Rasterized HUD / menu labels
+text_cache = TextSpriteCache()
+
+# Per-level leaderboards, saved in the background (see scores.py)
+score_store = ScoreStore(HIGHSCORE_FILE)
+
+# Seeded wall layouts for every level (see levels.py)
+level_cache = LevelCache(LEVELS_FILE, WALL_SIZE, FOOD_SIZE)
+
+# -------------------------
+# Snake game class (robust)
+# -------------------------
+class SnakeGameClass:
+    """Snake game state and per-frame logic.
+
+    `clock` and `rng` can be injected (e.g. a manual clock and a seeded
+    random.Random) to run the game deterministically without a camera.
+    `sound` is called with "eat" / "game_over" events. Finished games are
+    recorded in `scores` (the shared score_store by default); with
+    `persist=False` no scores are read or recorded. `head_filter` smooths
+    the fingertip (see filters.py; a One Euro filter by default). Walls come
+    from `levels` (the shared level_cache by default), one of the level's
+    precomputed layouts per game.
+    """
+
+    def __init__(self, pathFood, level=1, clock=time.time, rng=None, sound=None, persist=True, head_filter=None,
+                 scores=None, levels=None):
+        self.level = level
+        self.clock = clock
+        self.rng = rng if rng is not None else random.Random()
+        self.sound = sound
+        self.persist = persist
+        self.scores = (scores if scores is not None else score_store) if persist else None
+        self.levels = levels if levels is not None else level_cache
+        self.body = SnakeBody()
+        self.renderer = SnakeRenderer()
+        self.layers = LayerCompositor()
+        self.allowedLength = 150
+        self.previousHead = (0, 0)
+        self.smoothedHead = None
+        self.headFilter = head_filter if head_filter is not None else OneEuroFilter()
+
+        # sprites are decoded once per process and shared between games
+        self.spriteFood = asset_cache.sprite(pathFood, FOOD_SIZE)
+        self.imgFood = self.spriteFood.image
+        self.hFood, self.wFood = self.imgFood.shape[0], self.imgFood.shape[1]
+
+        self.spriteWall = asset_cache.sprite(WALL_PATH_DEFAULT, WALL_SIZE)
+        self.imgWall = self.spriteWall.image
+        self.hWall, self.wWall = self.imgWall.shape[0], self.imgWall.shape[1]
+
+        # spatial index over permanent walls and dynamic obstacles, plus the
+        # matching occupancy bitmap used to place new sprites in free space
+        self.grid = RectGrid(cell_size=max(self.wWall, self.hWall))
+        self.occupancy = OccupancyMap()
+        self.permanent_walls = []
+        self.layout = None
+        self.generate_permanent_walls()
+
+        self.obstacles = []
+        self.obstacleTimers = {}
+        self.foodPoint = (0, 0)
+        self.randomFoodLocation()
+
+        self.score = 0
+        self.highScore = self.loadHighScore()
+        self.gameOver = False
+        self.gameOverTime = None
+        self.speedFactor = 1.0
+
+        self.lastMovementTime = self.clock()
+        self.startTime = self.clock()
+
+    def generate_permanent_walls(self):
+        # pick one of the level's validated layouts; its occupancy bitmap is precomputed
+        self.layout = self.levels.layout(self.level, self.rng.randrange(self.levels.variants))
+        self.permanent_walls = list(self.layout.walls)
+        self.grid.clear()
+        for pos, rect in zip(self.layout.walls, self.layout.rects):
+            self.grid.insert(("wall", pos), rect)
+        self.occupancy.load(self.layout.occupancy())
+
+    def addBlock(self, key):
+        x, y = key[1]
+        rect = (x, y, x + self.wWall, y + self.hWall)
+        self.grid.insert(key, rect)
+        self.occupancy.add_rect(rect)
+
+    def removeBlock(self, key):
+        rect = self.grid.rects.get(key)
+        if rect is not None:
+            self.grid.remove(key)
+            self.occupancy.remove_rect(rect)
+
+    def loadHighScore(self):
+        return self.scores.best(self.level) if self.scores is not None else 0
+
+    def recordScore(self, score, players=1):
+        """Put a finished game on the level's leaderboard (memory only; saved in the background)."""
+        if score > self.highScore:
+            self.highScore = score
+        if self.scores is not None:
+            self.scores.record(self.level, score, players)
+
+    def quit(self):
+        """Leaving mid-game: the game in progress still counts."""
+        if not self.gameOver and self.score > 0:
+            self.recordScore(self.score)
+
+    def playSound(self, event):
+        if self.sound is not None:
+            self.sound(event)
+
+    def foodRect(self):
+        x, y = self.foodPoint
+        return (x - self.wFood // 2, y - self.hFood // 2, x + self.wFood // 2, y + self.hFood // 2)
+
+    def filters(self):
+        """Fingertip filters in use (one per player)."""
+        return [self.headFilter]
+
+    def bodyPoints(self):
+        """Body polyline(s) that food and obstacles must not be placed on."""
+        return self.body.points()
+
+    def randomFoodLocation(self):
+        half_w, half_h = self.wFood // 2, self.hFood // 2
+        size = (2 * half_w, 2 * half_h)
+        bounds = (100 - half_w, 100 - half_h, 1000 - half_w, 600 - half_h)
+        # keep food off the snake too; if the body leaves no room, only avoid walls
+        pos = self.occupancy.sample(size, bounds, rng=self.rng, body=self.bodyPoints(), body_thickness=self.renderer.thickness)
+        if pos is None:
+            pos = self.occupancy.sample(size, bounds, rng=self.rng)
+        if pos is None:
+            self.foodPoint = (self.rng.randint(100, 1000), self.rng.randint(100, 600))
+            return
+        self.foodPoint = (pos[0] + half_w, pos[1] + half_h)
+
+    def spawnObstacle(self):
+        if len(self.obstacles) >= 3:
+            return
+        pos = self.occupancy.sample((self.wWall, self.hWall), (200, 200, 1000, 600), rng=self.rng,
+                                    extra_rects=[self.foodRect()],
+                                    body=self.bodyPoints(), body_thickness=self.renderer.thickness)
+        if pos is None:
+            return
+        self.obstacles.append(pos)
+        self.addBlock(("obstacle", pos))
+        self.obstacleTimers[pos] = self.clock() + self.rng.randint(5, 10)
+
+    def removeOldObstacles(self):
+        current_time = self.clock()
+        for obs in self.obstacles:
+            if self.obstacleTimers.get(obs, 0) <= current_time:
+                self.removeBlock(("obstacle", obs))
+        self.obstacles = [obs for obs in self.obstacles if self.obstacleTimers.get(obs, 0) > current_time]
+        self.obstacleTimers = {obs: timer for obs, timer in self.obstacleTimers.items() if timer > current_time}
+
+    def resetGame(self):
+        # reinitialize most vars but preserve level
+        self.body.clear()
+        self.allowedLength = 150
+        self.previousHead = (0, 0)
+        self.score = 0
+        self.gameOver = False
+        self.speedFactor = 1.0
+        self.obstacles = []
+        self.obstacleTimers = {}
+        self.generate_permanent_walls()
+        self.randomFoodLocation()
+        self.gameOverTime = None
+        self.lastMovementTime = self.clock()
+        self.startTime = self.clock()
+        self.smoothedHead = None
+        self.headFilter.reset()
+
+    def drawStaticLayer(self, imgMain):
+        # rebuilt only when food, walls or obstacles actually move
+        key = (self.foodPoint, tuple(self.permanent_walls), tuple(self.obstacles))
+        if self.layers.stale(key, imgMain.shape):
+            rx, ry = self.foodPoint
+            sprites = [(self.spriteFood, (rx - self.wFood // 2, ry - self.hFood // 2))]
+            sprites += [(self.spriteWall, pos) for pos in self.permanent_walls + self.obstacles]
+            self.layers.build(key, imgMain.shape, sprites)
+        return self.layers.blend(imgMain)
+
+    def drawGame(self, imgMain, alpha=1.0):
+        # draw snake body, with the head eased from the previous tick toward the current one
+        points = self.body.points()
+        head = None
+        if alpha < 1.0 and len(points) >= 2:
+            (px, py), (hx, hy) = points[-2], points[-1]
+            head = (int(px + (hx - px) * alpha), int(py + (hy - py) * alpha))
+        imgMain = self.renderer.draw(imgMain, points, head=head)
+
+        # overlay food, permanent walls and dynamic obstacles as one cached layer
+        imgMain = self.drawStaticLayer(imgMain)
+
+        text_cache.putTextRect(imgMain, f'Score: {self.score}', [50, 50], scale=2, thickness=2, offset=5)
+        text_cache.putTextRect(imgMain, f'High Score: {self.highScore}', [50, 100], scale=2, thickness=2, offset=5)
+        text_cache.putTextRect(imgMain, f'Level: {self.level}', [50, 150], scale=2, thickness=2, offset=5)
+        return imgMain
+
+    def drawGameOver(self, imgMain):
+        text_cache.putTextRect(imgMain, "Game Over", [400, 300], scale=5, thickness=6, offset=20,
+                               colorR=(0, 0, 255), colorT=(255, 255, 255))
+        text_cache.putTextRect(imgMain, f'Your Score: {self.score}', [450, 380], scale=2, thickness=2)
+        text_cache.putTextRect(imgMain, f'High Score: {self.highScore}', [450, 420], scale=2, thickness=2)
+        return imgMain
+
+    def draw(self, imgMain, alpha=1.0):
+        """Render the current state; `alpha` is how far the display is between the last two ticks."""
+        if self.gameOver:
+            return self.drawGameOver(imgMain)
+        return self.drawGame(imgMain, alpha)
+
+    def update(self, imgMain, currentHead):
+        """Advance one tick from the fingertip position; draws onto imgMain unless it is None."""
+        self.step(currentHead)
+        if imgMain is not None:
+            imgMain = self.draw(imgMain)
+        return imgMain
+
+    def endGame(self, currentTime):
+        self.recordScore(self.score)
+        self.playSound("game_over")
+        self.gameOver = True
+        self.gameOverTime = currentTime
+
+    def step(self, currentHead):
+        """Advance the simulation by one tick; all timers read self.clock()."""
+        currentTime = self.clock()
+        self.smoothedHead = self.headFilter(currentHead, currentTime)
+        cx, cy = self.smoothedHead
+        invincible = (currentTime - self.startTime) < 5
+
+        # Game over restart logic
+        if self.gameOver:
+            if self.gameOverTime is None:
+                self.gameOverTime = currentTime
+            if currentTime - self.gameOverTime > 3:
+                self.resetGame()
+            return
+
+        # track movement inactivity (keep original idea)
+        px, py = self.previousHead
+        if not invincible and self.previousHead != (0, 0):
+            movementDistance = math.hypot(cx - self.previousHead[0], cy - self.previousHead[1])
+            if movementDistance >= 10:
+                self.lastMovementTime = currentTime
+            elif currentTime - self.lastMovementTime > 2:
+                self.endGame(currentTime)
+                return
+
+        # append points & lengths
+        distance = math.hypot(cx - px, cy - py) * self.speedFactor
+        self.body.append(cx, cy, distance)
+        self.previousHead = (cx, cy)
+
+        # trim tail if too long
+        self.body.trim(self.allowedLength)
+
+        # food collision
+        rx, ry = self.foodPoint
+        if rx - self.wFood // 2 < cx < rx + self.wFood // 2 and ry - self.hFood // 2 < cy < ry + self.hFood // 2:
+            self.randomFoodLocation()
+            self.allowedLength += 25
+            self.score += 1
+            self.speedFactor += 0.02
+            self.playSound("eat")
+            if self.rng.random() > 0.5:
+                self.spawnObstacle()
+
+        self.removeOldObstacles()
+
+        # collision checks
+        if not invincible:
+            # snake collision with walls and obstacles
+            if self.grid.hit(cx, cy) is not None:
+                self.endGame(currentTime)
+                return
+
+            # self-collision: head within 1px of the body centerline (excluding the neck)
+            if self.score >= 7 and self.body.self_distance(cx, cy, radius=1) is not None:
+                self.endGame(currentTime)
@@ -0,0 +1,99 @@
+import time
+
+# Ordered best to cheapest. Each step trades some fidelity for frame time:
+#   detect_every    run hand detection on every Nth frame
+#   detect_scale    downscale of the hand-tracking window before detection
+#   draw_landmarks  draw the detected hand (landmarks, box and center)
+#   body_step       draw every Nth body point
+#   hud_interval    seconds between refreshes of the stats overlay
+QUALITY_LEVELS = [
+    {"name": "high", "detect_every": 2, "detect_scale": 1.0,
+     "draw_landmarks": True, "body_step": 1, "hud_interval": 0.5},
+    {"name": "medium", "detect_every": 3, "detect_scale": 0.75,
+     "draw_landmarks": True, "body_step": 1, "hud_interval": 1.0},
+    {"name": "low", "detect_every": 4, "detect_scale": 0.5,
+     "draw_landmarks": False, "body_step": 2, "hud_interval": 2.0},
+    {"name": "lowest", "detect_every": 6, "detect_scale": 0.5,
+     "draw_landmarks": False, "body_step": 3, "hud_interval": 2.0},
+]
+
+
+class QualityGovernor:
+    """Steps quality levels up and down to hold a target frame rate.
+
+    Every `window` seconds the measured FPS and the per-frame work time (the
+    part of the frame not spent waiting for the camera) are compared to the
+    frame budget. Quality drops only after `down_after` slow windows in which
+    the loop itself is the bottleneck, and rises only after `up_after`
+    windows with clear headroom; a `cooldown` after every change keeps the
+    two from oscillating.
+    """
+
+    def __init__(self, target_fps=30.0, levels=QUALITY_LEVELS, start=0, window=1.0,
+                 down_after=2, up_after=5, cooldown=3.0, enabled=True):
+        self.target_fps = target_fps
+        self.levels = levels
+        self.level = start
+        self.window = window
+        self.down_after = down_after
+        self.up_after = up_after
+        self.cooldown = cooldown
+        self.enabled = enabled
+
+        self.fps = 0.0
+        self.work_ms = 0.0
+        self.changes = 0
+        self._window_start = None
+        self._frames = 0
+        self._work = 0.0
+        self._slow = 0
+        self._fast = 0
+        self._last_change = -cooldown
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def describe(self):
+        return f"{self.settings['name']} ({self.level + 1}/{len(self.levels)})"
+
+    def update(self, work_seconds, now=None):
+        """Record one frame; returns the new settings dict when the level changes, else None."""
+        now = time.time() if now is None else now
+        if self._window_start is None:
+            self._window_start = now
+            return None
+        self._frames += 1
+        self._work += work_seconds
+        elapsed = now - self._window_start
+        if elapsed < self.window:
+            return None
+
+        self.fps = self._frames / elapsed
+        self.work_ms = self._work / self._frames * 1000.0
+        self._window_start, self._frames, self._work = now, 0, 0.0
+        if not self.enabled:
+            return None
+
+        budget_ms = 1000.0 / self.target_fps
+        if self.fps < self.target_fps * 0.9 and self.work_ms > budget_ms * 0.85:
+            self._slow, self._fast = self._slow + 1, 0
+        elif self.work_ms < budget_ms * 0.5:
+            self._fast, self._slow = self._fast + 1, 0
+        else:
+            self._slow = self._fast = 0
+
+        if now - self._last_change < self.cooldown:
+            return None
+        if self._slow >= self.down_after and self.level < len(self.levels) - 1:
+            return self._set(self.level + 1, now)
+        if self._fast >= self.up_after and self.level > 0:
+            return self._set(self.level - 1, now)
+        return None
+
+    def _set(self, level, now):
+        self.level = level
+        self.changes += 1
+        self._last_change = now
+        self._slow = self._fast = 0
+        return self.settings
@@ -0,0 +1,155 @@
+"""Headless game runner: drives SnakeGameClass without camera, window or mixer.
+
+    python headless.py --ticks 20000 --seed 7 --level 3
+    python headless.py --stream recorded_tips.json --render
+    python headless.py --fps 15 --tick-rate 30    # slow frames, two game ticks each
+
+Fingertips come from a recorded stream (a JSON list of [x, y] or null for
+"no hand") or from a synthetic player that steers toward the food. Time comes
+from a manual clock advanced by 1/fps per tick, so a run with the same seed
+and stream always plays out the same way.
+"""
+import argparse
+import json
+import math
+import random
+import time
+
+import numpy as np
+
+from filters import HEAD_FILTERS, make_filter
+from game import SnakeGameClass, FOOD_PATH_DEFAULT
+from scheduler import FixedStepScheduler
+
+
+class ManualClock:
+    """Deterministic stand-in for time.time(); advanced explicitly by the runner."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, dt):
+        self.now += dt
+
+
+class FoodSeeker:
+    """Synthetic player: moves the fingertip toward the food with a little wobble."""
+
+    def __init__(self, seed=0, speed=25.0, wobble=8.0):
+        self.rng = random.Random(seed)
+        self.speed = speed
+        self.wobble = wobble
+        self.pos = [640.0, 360.0]
+
+    def __call__(self, game):
+        tx, ty = game.foodPoint
+        dx, dy = tx - self.pos[0], ty - self.pos[1]
+        dist = math.hypot(dx, dy) or 1.0
+        step = min(self.speed, dist)
+        self.pos[0] += dx / dist * step + self.rng.uniform(-self.wobble, self.wobble)
+        self.pos[1] += dy / dist * step + self.rng.uniform(-self.wobble, self.wobble)
+        return [int(self.pos[0]), int(self.pos[1])]
+
+
+class RecordedStream:
+    """Replays a recorded fingertip list, looping when it runs out."""
+
+    def __init__(self, points):
+        self.points = points
+        self.index = 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def __call__(self, game):
+        if not self.points:
+            return None
+        point = self.points[self.index % len(self.points)]
+        self.index += 1
+        return point
+
+
+def run_headless(source, ticks=10000, fps=30.0, seed=0, level=1, render=False, events=None, head_filter="one_euro",
+                 tick_rate=None):
+    """Run `ticks` game frames fed by `source(game) -> [x, y] | None`; returns a summary dict.
+
+    By default every frame is one game tick. With `tick_rate` the game runs on
+    a FixedStepScheduler as in main.py, stepping as many ticks per frame as
+    are due, and each step must see a later game clock than the one before.
+    """
+    clock = ManualClock()
+    counts = {"eat": 0, "game_over": 0}
+
+    def on_sound(event):
+        counts[event] = counts.get(event, 0) + 1
+        if events is not None:
+            events.append((clock.now, event))
+
+    scheduler = FixedStepScheduler(tick_rate) if tick_rate else None
+    game = SnakeGameClass(FOOD_PATH_DEFAULT, level, clock=scheduler.sim_time if scheduler else clock,
+                          rng=random.Random(seed), sound=on_sound, persist=False, head_filter=make_filter(head_filter))
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8) if render else None
+    best = 0
+    steps = 0
+    dt = 1.0 / fps
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tip = source(game)
+        due = scheduler.advance(clock.now) if scheduler else [clock.now]
+        if tip is not None:
+            for _ in due:
+                last = game.clock()
+                if scheduler:
+                    scheduler.tick()
+                    if game.clock() <= last and steps:
+                        raise RuntimeError(f"game clock did not advance between ticks ({last} -> {game.clock()})")
+                game.step(tip)
+                steps += 1
+            if frame is not None:
+                frame[:] = 0
+                game.draw(frame)
+            best = max(best, game.score)
+        clock.advance(dt)
+    elapsed = time.perf_counter() - start
+    return {
+        "ticks": ticks,
+        "steps": steps,
+        "seconds": round(elapsed, 4),
+        "ticks_per_second": round(ticks / elapsed, 1) if elapsed > 0 else None,
+        "best_score": best,
+        "score": game.score,
+        "eaten": counts["eat"],
+        "game_overs": counts["game_over"],
+        "body_points": len(game.body),
+        "food": list(game.foodPoint),
+        "walls": len(game.permanent_walls),
+        "obstacles": len(game.obstacles),
+        "filter": game.headFilter.describe(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run HOLOSNAKE game logic without a camera.")
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--fps", type=float, default=30.0, help="simulated frames per second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--stream", help="JSON list of fingertip [x, y] points (null = no hand)")
+    parser.add_argument("--render", action="store_true", help="also draw every frame off-screen")
+    parser.add_argument("--filter", default="one_euro", choices=sorted(HEAD_FILTERS), help="fingertip filter")
+    parser.add_argument("--tick-rate", type=float, help="run game ticks at this rate through the fixed-step scheduler")
+    args = parser.parse_args()
+
+    source = RecordedStream.load(args.stream) if args.stream else FoodSeeker(args.seed)
+    summary = run_headless(source, args.ticks, args.fps, args.seed, args.level, args.render,
+                           head_filter=args.filter, tick_rate=args.tick_rate)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
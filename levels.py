@@ -0,0 +1,261 @@
+"""Seeded, validated wall layouts for every level, cached on disk.
+
+    python levels.py --levels 20          # build (or extend) levels.npz offline
+
+Each level has VARIANTS layouts, each generated from a fixed seed, so a
+level always offers the same handful of boards. A layout is only accepted
+when every food spawn position can be reached from the rest of the free
+space by a snake of the drawn thickness and there is a clear spot to start
+in; otherwise the next seed is tried. Accepted layouts are stored with
+their collision rectangles and occupancy bitmap in one compressed .npz file
+that is read once, after which getting a layout is a dictionary lookup.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from spatial import OccupancyMap
+
+LAYOUT_VERSION = 2
+VARIANTS = 8                    # layouts per level; a new one is picked on every restart
+FIELD_SIZE = (1280, 720)
+WALL_BOUNDS = (200, 200, 1000, 600)     # range of wall top-left corners
+FOOD_BOUNDS = (100, 100, 1000, 600)     # range of food centers
+START_CLEARANCE = 100           # px of free space some point must have around it
+SNAKE_RADIUS = 10               # half the snake's drawn thickness: gaps narrower than 2x this are closed
+MIN_FOOD_AREA = 0.25            # share of food positions that must stay free
+MAX_ATTEMPTS = 50
+
+
+def wall_count(level):
+    """Levels 1-6 add two walls each (as before); later ones one more each, up to 30."""
+    if level <= 6:
+        return 2 * level
+    return min(12 + (level - 6), 30)
+
+
+class Layout:
+    """One validated wall layout: wall corners, their rectangles and the occupancy bitmap."""
+
+    def __init__(self, level, variant, walls, wall_size, packed, field_size=FIELD_SIZE):
+        self.level = level
+        self.variant = variant
+        self.walls = [(int(x), int(y)) for x, y in walls]
+        w, h = wall_size
+        self.rects = [(x, y, x + w, y + h) for x, y in self.walls]
+        self.field_size = field_size
+        self._packed = packed
+        self._occupancy = None
+
+    def occupancy(self):
+        """(height, width) uint8 count of walls covering each pixel, unpacked on first use."""
+        if self._occupancy is None:
+            w, h = self.field_size
+            bits = np.unpackbits(self._packed, count=w * h).reshape(h, w)
+            bits.flags.writeable = False
+            self._occupancy = bits
+        return self._occupancy
+
+
+def _occupancy_map(walls, wall_size, field_size):
+    occupancy = OccupancyMap(*field_size)
+    w, h = wall_size
+    for x, y in walls:
+        occupancy.add_rect((x, y, x + w, y + h))
+    return occupancy
+
+
+def validate(walls, wall_size, food_size, field_size=FIELD_SIZE):
+    """Whether the layout is playable.
+
+    Playable means: some point in the food area has START_CLEARANCE px of
+    room in every direction, every food spawn position can be reached from
+    there by the snake's head without passing closer than SNAKE_RADIUS to a
+    wall (so no food appears in a sealed pocket or behind a slit between two
+    walls), and enough of the food area is free.
+    """
+    occupancy = _occupancy_map(walls, wall_size, field_size)
+    free = (occupancy.counts == 0).astype(np.uint8)
+
+    # the field edge counts as a wall, and the clear spot must be inside the food area
+    dist = cv2.distanceTransform(np.pad(free, 1), cv2.DIST_L2, 5)[1:-1, 1:-1]
+    x0, y0, x1, y1 = FOOD_BOUNDS
+    inner = dist[y0:y1 + 1, x0:x1 + 1]
+    y, x = np.unravel_index(int(np.argmax(inner)), inner.shape)
+    x, y = x + x0, y + y0
+    clearance = float(dist[y, x])
+    if clearance < START_CLEARANCE:
+        return False
+
+    # where the head can go: free space shrunk by the snake's half-thickness
+    size = 2 * SNAKE_RADIUS + 1
+    passable = cv2.erode(free, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size)),
+                         borderType=cv2.BORDER_CONSTANT, borderValue=1)
+    _, labels = cv2.connectedComponents(passable, connectivity=4)
+    reachable = labels == labels[y, x]
+
+    fw, fh = food_size
+    half_w, half_h = fw // 2, fh // 2
+    bounds = (FOOD_BOUNDS[0] - half_w, FOOD_BOUNDS[1] - half_h, FOOD_BOUNDS[2] - half_w, FOOD_BOUNDS[3] - half_h)
+    x0, y0, x1, y1 = occupancy._window((2 * half_w, 2 * half_h), bounds)
+    region = occupancy.counts[y0:y1 + 2 * half_h, x0:x1 + 2 * half_w]
+    spots = occupancy._free_positions(region, (2 * half_w, 2 * half_h))
+    cols, rows = x1 - x0 + 1, y1 - y0 + 1
+    if len(spots) < MIN_FOOD_AREA * cols * rows:
+        return False
+    centers_x = x0 + spots % cols + half_w
+    centers_y = y0 + spots // cols + half_h
+    return bool(reachable[centers_y, centers_x].all())
+
+
+def generate(level, variant, wall_size, food_size, field_size=FIELD_SIZE):
+    """Build the layout for (level, variant); the same arguments always give the same layout."""
+    for attempt in range(MAX_ATTEMPTS):
+        rng = random.Random(f"{level}:{variant}:{attempt}")
+        occupancy = OccupancyMap(*field_size)
+        walls = []
+        w, h = wall_size
+        while len(walls) < wall_count(level):
+            pos = occupancy.sample(wall_size, WALL_BOUNDS, rng=rng)
+            if pos is None:
+                break
+            walls.append(pos)
+            occupancy.add_rect((pos[0], pos[1], pos[0] + w, pos[1] + h))
+        if validate(walls, wall_size, food_size, field_size):
+            packed = np.packbits(occupancy.counts > 0)
+            return Layout(level, variant, walls, wall_size, packed, field_size)
+    raise RuntimeError(f"No playable layout for level {level} variant {variant} after {MAX_ATTEMPTS} attempts")
+
+
+class LevelCache:
+    """Layouts for every level, loaded from `path` once and generated on first use.
+
+    After load() (done by the first lookup if not called earlier),
+    layout(level, variant) never touches the disk: a level missing from the
+    file is generated in memory (and written by the next save()). The file is
+    ignored and rebuilt when it was made with other sizes or generator version.
+    """
+
+    def __init__(self, path, wall_size, food_size, field_size=FIELD_SIZE, variants=VARIANTS):
+        self.path = path
+        self.wall_size = tuple(wall_size)
+        self.food_size = tuple(food_size)
+        self.field_size = tuple(field_size)
+        self.variants = variants
+        self.generated = 0
+        self._levels = {}           # level -> [Layout] * variants
+        self._dirty = False
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _meta(self):
+        return {"version": LAYOUT_VERSION, "wall_size": list(self.wall_size), "food_size": list(self.food_size),
+                "field_size": list(self.field_size), "variants": self.variants,
+                "wall_bounds": list(WALL_BOUNDS), "food_bounds": list(FOOD_BOUNDS),
+                "start_clearance": START_CLEARANCE, "snake_radius": SNAKE_RADIUS, "min_food_area": MIN_FOOD_AREA}
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return self
+            self._loaded = True
+            if self.path is None or not os.path.exists(self.path):
+                return self
+            try:
+                with np.load(self.path) as data:
+                    if json.loads(str(data["meta"])) != self._meta():
+                        print(f"[INFO] Level cache {self.path} is out of date; rebuilding")
+                        self._dirty = True
+                        return self
+                    levels, counts = data["levels"], data["wall_count"]
+                    walls, packed = data["walls"], data["occupancy"]
+            except Exception as e:
+                print(f"[WARNING] Could not read level cache {self.path}: {e}")
+                self._dirty = True
+                return self
+            for row, level in enumerate(levels):
+                level = int(level)
+                self._levels[level] = [
+                    Layout(level, v, walls[row, v, :counts[row, v]], self.wall_size, packed[row, v], self.field_size)
+                    for v in range(self.variants)]
+            return self
+
+    def prepare(self, levels):
+        """Load the file, generate any of `levels` it lacks and save if anything changed."""
+        self.load()
+        for level in levels:
+            self.layouts(level)
+        self.save()
+        return self
+
+    def layouts(self, level):
+        if not self._loaded:
+            self.load()
+        with self._lock:
+            found = self._levels.get(level)
+            if found is None:
+                found = self._levels[level] = [generate(level, v, self.wall_size, self.food_size, self.field_size)
+                                               for v in range(self.variants)]
+                self.generated += 1
+                self._dirty = True
+            return found
+
+    def layout(self, level, variant=0):
+        return self.layouts(level)[variant % self.variants]
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self.path is None:
+                return False
+            levels = sorted(self._levels)
+            rows = [self._levels[level] for level in levels]
+            most = max((len(l.walls) for row in rows for l in row), default=0)
+            walls = np.zeros((len(levels), self.variants, most, 2), dtype=np.int16)
+            counts = np.zeros((len(levels), self.variants), dtype=np.int16)
+            for r, row in enumerate(rows):
+                for v, layout in enumerate(row):
+                    counts[r, v] = len(layout.walls)
+                    walls[r, v, :len(layout.walls)] = layout.walls
+            arrays = {
+                "meta": np.array(json.dumps(self._meta())),
+                "levels": np.array(levels, dtype=np.int32),
+                "wall_count": counts,
+                "walls": walls,
+                "occupancy": np.array([[l._packed for l in row] for row in rows], dtype=np.uint8),
+            }
+            # write-then-rename so a half-written cache is never picked up
+            tmp = self.path + ".tmp.npz"
+            try:
+                np.savez_compressed(tmp, **arrays)
+                os.replace(tmp, self.path)
+            except Exception as e:
+                print("[WARNING] Could not save level cache:", e)
+                return False
+            self._dirty = False
+            return True
+
+
+def main():
+    from game import level_cache
+
+    parser = argparse.ArgumentParser(description="Generate and cache HOLOSNAKE level layouts.")
+    parser.add_argument("--levels", type=int, default=6, help="build levels 1..N")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the existing cache file")
+    args = parser.parse_args()
+    if args.rebuild and os.path.exists(level_cache.path):
+        os.remove(level_cache.path)
+    start = time.perf_counter()
+    level_cache.prepare(range(1, args.levels + 1))
+    size = os.path.getsize(level_cache.path) if os.path.exists(level_cache.path) else 0
+    print(json.dumps({"levels": args.levels, "generated": level_cache.generated, "variants": level_cache.variants,
+                      "seconds": round(time.perf_counter() - start, 3), "bytes": size}))
+
+
+if __name__ == "__main__":
+    main()
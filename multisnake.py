@@ -0,0 +1,327 @@
+import copy
+import time
+
+import numpy as np
+
+from game import SnakeGameClass, text_cache
+from rendering import SnakeRenderer
+
+PLAYER_COLORS = [(0, 0, 255), (255, 128, 0), (0, 200, 255), (255, 0, 200)]   # body colors, BGR
+
+
+class SnakeArrays:
+    """Struct-of-arrays state for N snakes, updated for all snakes at once.
+
+    Each snake's points live in row i of a (n, capacity, 2) ring. Every point
+    also stores the snake's odometer (total distance travelled) when it was
+    added, so the live body is simply the points within `allowed` of the
+    head's odometer and trimming needs no per-snake loop: trim() turns that
+    mask into each snake's live `count`. The ring doubles in size when a
+    live body fills it, as SnakeBody's buffer does.
+    """
+
+    def __init__(self, n, capacity=1024):
+        self.n = n
+        self.capacity = capacity
+        self.points = np.zeros((n, capacity, 2), dtype=np.int32)
+        self.odometer = np.zeros((n, capacity), dtype=np.float64)
+        self.head = np.full(n, -1, dtype=np.intp)        # ring slot of the newest point
+        self.count = np.zeros(n, dtype=np.intp)
+        self.distance = np.zeros(n, dtype=np.float64)    # odometer of the head
+
+        self.allowed = np.full(n, 150.0)
+        self.speed = np.ones(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.smoothed = np.zeros((n, 2), dtype=np.float64)
+        self.has_smoothed = np.zeros(n, dtype=bool)
+        self.previous = np.zeros((n, 2), dtype=np.float64)
+        self.has_previous = np.zeros(n, dtype=bool)
+        self.over = np.zeros(n, dtype=bool)
+        self.over_time = np.zeros(n)
+        self.start_time = np.zeros(n)
+        self.last_move = np.zeros(n)
+
+    def reset(self, mask, now):
+        self.head[mask] = -1
+        self.count[mask] = 0
+        self.distance[mask] = 0.0
+        self.allowed[mask] = 150.0
+        self.speed[mask] = 1.0
+        self.score[mask] = 0
+        self.has_smoothed[mask] = False
+        self.has_previous[mask] = False
+        self.over[mask] = False
+        self.start_time[mask] = now
+        self.last_move[mask] = now
+
+    def clear_bodies(self, mask):
+        self.count[mask] = 0
+
+    def _grow(self):
+        # re-lay every ring oldest-first into a buffer twice the size
+        capacity = 2 * self.capacity
+        points = np.zeros((self.n, capacity, 2), dtype=self.points.dtype)
+        odometer = np.zeros((self.n, capacity), dtype=self.odometer.dtype)
+        for i in range(self.n):
+            m = int(self.count[i])
+            idx = (self.head[i] - np.arange(m)[::-1]) % self.capacity
+            points[i, :m] = self.points[i, idx]
+            odometer[i, :m] = self.odometer[i, idx]
+            self.head[i] = m - 1 if m else -1
+        self.points, self.odometer, self.capacity = points, odometer, capacity
+
+    def append(self, mask, xy, step):
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return
+        if (self.count[rows] >= self.capacity).any():
+            self._grow()
+        slot = (self.head[rows] + 1) % self.capacity
+        self.distance[rows] += step[rows]
+        self.points[rows, slot] = xy[rows]
+        self.odometer[rows, slot] = self.distance[rows]
+        self.head[rows] = slot
+        self.count[rows] += 1
+
+    def trim(self):
+        """Drop points that fell outside `allowed`, so count is the live body length."""
+        rows = np.arange(self.n)
+        # the tail moves a point or two per tick, so peel dead tails a step at a time
+        while True:
+            tail = (self.head - self.count + 1) % self.capacity
+            dead = (self.count > 0) & (self.distance - self.odometer[rows, tail] > self.allowed)
+            if not dead.any():
+                return
+            self.count[dead] -= 1
+
+    def ordered(self):
+        """Points newest first as (n, k, 2) plus an (n, k) live mask, k = longest live body."""
+        k = int(self.count.max()) if self.n else 0
+        idx = (self.head[:, None] - np.arange(k)) % self.capacity
+        rows = np.arange(self.n)[:, None]
+        pts = self.points[rows, idx]
+        live = np.arange(k) < self.count[:, None]
+        live &= self.distance[:, None] - self.odometer[rows, idx] <= self.allowed[:, None]
+        return pts, live
+
+    def polyline(self, i):
+        """Live body of snake `i` as an (m, 2) int32 array, tail first."""
+        m = int(self.count[i])
+        if not m:
+            return self.points[i, :0]
+        idx = (self.head[i] - np.arange(m)) % self.capacity
+        keep = self.distance[i] - self.odometer[i, idx] <= self.allowed[i]
+        return self.points[i, idx[keep][::-1]]
+
+
+class MultiSnakeGame(SnakeGameClass):
+    """N snakes sharing one board (walls, obstacles, food), one per tracked hand.
+
+    step() takes one fingertip (or None) per player, runs it through that
+    player's fingertip filter and advances every snake with batched NumPy
+    operations: inactivity, growth, trimming, food pickup, wall hits and
+    collisions against every snake's body, so the per-tick cost barely
+    depends on the number of players. A snake that dies
+    sits out for 3 seconds and then respawns; the others keep playing.
+    """
+
+    NECK_SEGMENTS = 3       # own newest segments ignored by self-collision
+
+    def __init__(self, pathFood, level=1, players=2, clock=time.time, rng=None, sound=None, persist=True,
+                 head_filter=None, scores=None):
+        self.players = players
+        self.snakes = SnakeArrays(players)
+        self._wall_array = None
+        super().__init__(pathFood, level, clock=clock, rng=rng, sound=sound, persist=persist,
+                         head_filter=head_filter, scores=scores)
+        self.playerFilters = [copy.deepcopy(self.headFilter) for _ in range(players)]
+        self.renderers = [SnakeRenderer(color=PLAYER_COLORS[i % len(PLAYER_COLORS)]) for i in range(players)]
+        self.renderer = self.renderers[0]
+        self.snakes.reset(np.ones(players, dtype=bool), self.clock())
+
+    # -- board ---------------------------------------------------------------
+    def filters(self):
+        return self.playerFilters
+
+    def bodyPoints(self):
+        return [self.snakes.polyline(i) for i in range(self.players)]
+
+    def generate_permanent_walls(self):
+        super().generate_permanent_walls()
+        self._wall_array = None
+
+    def addBlock(self, key):
+        super().addBlock(key)
+        self._wall_array = None
+
+    def removeBlock(self, key):
+        super().removeBlock(key)
+        self._wall_array = None
+
+    def wallArray(self):
+        if self._wall_array is None:
+            rects = list(self.grid.rects.values())
+            self._wall_array = np.array(rects, dtype=np.float64).reshape(-1, 4)
+        return self._wall_array
+
+    # -- players -------------------------------------------------------------
+    def loadHighScore(self):
+        # multi-player results have their own board per player count
+        return self.scores.best(self.level, self.players) if self.scores is not None else 0
+
+    def quit(self):
+        s = self.snakes
+        for i in np.flatnonzero(~s.over & (s.score > 0)):
+            self.recordScore(int(s.score[i]), self.players)
+
+    def assignTips(self, tips):
+        """Order fingertips by player: each goes to the nearest unclaimed snake head."""
+        s = self.snakes
+        out = [None] * self.players
+        free = list(range(self.players))
+        for tip in tips[:self.players]:
+            tracked = [i for i in free if s.has_smoothed[i]]
+            if tracked:
+                i = min(tracked, key=lambda j: (s.smoothed[j, 0] - tip[0]) ** 2 + (s.smoothed[j, 1] - tip[1]) ** 2)
+            else:
+                i = free[0]
+            out[i] = tip
+            free.remove(i)
+        return out
+
+    def endSnakes(self, mask, now):
+        if not mask.any():
+            return
+        s = self.snakes
+        for i in np.flatnonzero(mask):
+            self.recordScore(int(s.score[i]), self.players)
+        s.over |= mask
+        s.over_time[mask] = now
+        s.clear_bodies(mask)
+        self.playSound("game_over")
+
+    def respawn(self, mask, now):
+        s = self.snakes
+        s.reset(mask, now)
+        for i in np.flatnonzero(mask):
+            self.playerFilters[i].reset()
+
+    # -- simulation ----------------------------------------------------------
+    def step(self, tips):
+        """Advance every snake by one tick; `tips` holds one (x, y) or None per player."""
+        s = self.snakes
+        now = self.clock()
+        present = np.array([t is not None for t in tips], dtype=bool)
+        xy = np.array([t if t is not None else (0, 0) for t in tips], dtype=np.float64).reshape(-1, 2)
+
+        respawn = s.over & (now - s.over_time > 3)
+        if respawn.any():
+            self.respawn(respawn, now)
+        active = present & ~s.over
+
+        # fingertip filters are tiny scalar state machines, one per player
+        for i in np.flatnonzero(active):
+            s.smoothed[i] = self.playerFilters[i](xy[i], now)
+        s.has_smoothed |= active
+        head = s.smoothed
+        invincible = (now - s.start_time) < 5
+
+        # inactivity
+        moved = np.hypot(head[:, 0] - s.previous[:, 0], head[:, 1] - s.previous[:, 1])
+        watched = active & ~invincible & s.has_previous
+        s.last_move[watched & (moved >= 10)] = now
+        idle = watched & (moved < 10) & (now - s.last_move > 2)
+        self.endSnakes(idle, now)
+        active &= ~idle
+
+        # grow, then trim each tail to its allowed length
+        s.append(active, head.astype(np.int32), np.where(s.has_previous, moved, 0.0) * s.speed)
+        s.trim()
+        s.previous[active] = head[active]
+        s.has_previous |= active
+
+        # food: one piece on the board, the lowest-numbered player on it gets it
+        rx, ry = self.foodPoint
+        eats = active & (np.abs(head[:, 0] - rx) < self.wFood // 2) & (np.abs(head[:, 1] - ry) < self.hFood // 2)
+        if eats.any():
+            i = int(np.argmax(eats))
+            s.allowed[i] += 25
+            s.score[i] += 1
+            s.speed[i] += 0.02
+            self.score = int(s.score.max())
+            self.randomFoodLocation()
+            self.playSound("eat")
+            if self.rng.random() > 0.5:
+                self.spawnObstacle()
+
+        self.removeOldObstacles()
+
+        vulnerable = active & ~invincible
+        if vulnerable.any():
+            self.endSnakes(vulnerable & (self.wallHits(head) | self.bodyHits(head)), now)
+
+    def wallHits(self, head):
+        rects = self.wallArray()
+        if not len(rects):
+            return np.zeros(len(head), dtype=bool)
+        x, y = head[:, 0:1], head[:, 1:2]
+        inside = (rects[:, 0] < x) & (x < rects[:, 2]) & (rects[:, 1] < y) & (y < rects[:, 3])
+        return inside.any(axis=1)
+
+    def bodyHits(self, head):
+        """Per player: does the head touch any snake body (its own only from score 7)?"""
+        s = self.snakes
+        pts, live = s.ordered()
+        n = self.players
+        if pts.shape[1] < 2:
+            return np.zeros(n, dtype=bool)
+        # other bodies are solid (half the body thickness); own body uses the
+        # single-player rule: centerline within 1px, beyond the neck, from score 7
+        radius = np.full((n, n), self.renderer.thickness / 2.0)
+        np.fill_diagonal(radius, np.where(s.score >= 7, 1.0, -1.0))
+
+        a = pts[:, 1:].astype(np.float64)           # older end of each segment
+        ab = pts[:, :-1] - a
+        mid = a + 0.5 * ab
+        half = 0.5 * np.hypot(ab[..., 0], ab[..., 1])
+        # cheap (heads, snakes, segments) prefilter: a segment can only be within
+        # `radius` of a head whose distance to its midpoint is under half + radius
+        dx = head[:, None, None, 0] - mid[None, ..., 0]
+        dy = head[:, None, None, 1] - mid[None, ..., 1]
+        reach = half[None] + radius[..., None]
+        near = (dx * dx + dy * dy <= reach * reach) & (live[:, 1:] & live[:, :-1])[None]
+        own = np.arange(n)
+        near[own, own, :self.NECK_SEGMENTS] = False
+        h, o, k = np.nonzero(near)
+        if not len(h):
+            return np.zeros(n, dtype=bool)
+        # exact point-to-segment distance for the few candidates
+        seg_a, seg_ab = a[o, k], ab[o, k]
+        ap = head[h] - seg_a
+        t = np.clip((ap * seg_ab).sum(1) / np.maximum((seg_ab * seg_ab).sum(1), 1e-9), 0.0, 1.0)
+        d = np.hypot(*(ap - seg_ab * t[:, None]).T)
+        hit = np.zeros(n, dtype=bool)
+        hit[h[d <= radius[h, o]]] = True
+        return hit
+
+    # -- drawing -------------------------------------------------------------
+    def drawGame(self, imgMain, alpha=1.0):
+        for i, renderer in enumerate(self.renderers):
+            renderer.step = self.renderer.step
+            points = self.snakes.polyline(i)
+            head = None
+            if alpha < 1.0 and len(points) >= 2:
+                (px, py), (hx, hy) = points[-2], points[-1]
+                head = (int(px + (hx - px) * alpha), int(py + (hy - py) * alpha))
+            renderer.draw(imgMain, points, head=head)
+
+        self.drawStaticLayer(imgMain)
+
+        for i in range(self.players):
+            label = f'P{i + 1}: {int(self.snakes.score[i])}' + (' (out)' if self.snakes.over[i] else '')
+            text_cache.putTextRect(imgMain, label, [50, 50 + 50 * i], scale=2, thickness=2, offset=5,
+                                   colorR=PLAYER_COLORS[i % len(PLAYER_COLORS)])
+        y = 50 + 50 * self.players
+        text_cache.putTextRect(imgMain, f'High Score: {self.highScore}', [50, y], scale=2, thickness=2, offset=5)
+        text_cache.putTextRect(imgMain, f'Level: {self.level}', [50, y + 50], scale=2, thickness=2, offset=5)
+        return imgMain
@@ -0,0 +1,262 @@
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+
+class FrameSink:
+    """Something composed frames are sent to: a stream, a file, a second screen.
+
+    write(frame, timestamp) runs on an encoder worker, one call at a time per
+    sink, and must not modify the frame. `fps` caps how often the sink is fed;
+    wants() lets a sink skip frames nobody would see (e.g. no viewers).
+    """
+
+    name = "sink"
+
+    def __init__(self, fps=None):
+        self.fps = fps
+        self.written = 0
+        self.dropped = 0            # frames missed because the sink was still busy
+        self.skipped = 0            # frames left out to keep to `fps`
+        self.busy = False
+        self.next_due = None
+
+    def due(self, timestamp, tolerance=0.25):
+        """Whether a frame at `timestamp` keeps the sink at its `fps` (always True without a cap).
+
+        Frames are scheduled against a running deadline, so a source at exactly
+        `fps` is never thinned out; `tolerance` (a fraction of a frame period)
+        absorbs timing jitter, and after a long gap the schedule restarts.
+        """
+        if not self.fps:
+            return True
+        period = 1.0 / self.fps
+        if self.next_due is not None and timestamp < self.next_due - tolerance * period:
+            return False
+        if self.next_due is None or timestamp - self.next_due > period:
+            self.next_due = timestamp
+        self.next_due += period
+        return True
+
+    def wants(self):
+        return True
+
+    def write(self, frame, timestamp):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MjpegServer(FrameSink):
+    """Serves the game screen as an MJPEG stream on http://host:port/ (localhost only by default).
+
+    Frames are only JPEG-encoded while at least one client is connected.
+    Every client gets the newest frame; a slow client skips frames rather
+    than holding up the encoder or other clients.
+    """
+
+    name = "mjpeg"
+
+    def __init__(self, port=8765, host="127.0.0.1", quality=80, fps=15):
+        super().__init__(fps)
+        self.quality = quality
+        self.clients = 0
+        self._jpeg = None
+        self._seq = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/stream.mjpg"):
+                    self.send_error(404)
+                    return
+                server._serve(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://{host}:{self._httpd.server_address[1]}/"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="MjpegServer", daemon=True)
+        self._thread.start()
+
+    def wants(self):
+        return self.clients > 0
+
+    def write(self, frame, timestamp):
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+        with self._cond:
+            self._jpeg = jpeg.tobytes()
+            self._seq += 1
+            self._cond.notify_all()
+
+    def _serve(self, request):
+        request.send_response(200)
+        request.send_header("Cache-Control", "no-cache")
+        request.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+        request.end_headers()
+        with self._cond:
+            self.clients += 1
+        seen = 0
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq != seen or self._closed, timeout=1.0)
+                    if self._closed:
+                        return
+                    if self._seq == seen:
+                        continue
+                    jpeg, seen = self._jpeg, self._seq
+                request.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n"
+                                    + f"Content-Length: {len(jpeg)}\r\n\r\n".encode() + jpeg + b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class SegmentedVideoWriter(FrameSink):
+    """Records the game screen to `directory` as video files of `segment_seconds` each.
+
+    Frames are placed by their timestamps: when frames were dropped upstream
+    the last one is repeated, so the video keeps real-time pacing.
+    """
+
+    name = "video"
+
+    def __init__(self, directory, fps=30, segment_seconds=60, fourcc="mp4v", ext=".mp4"):
+        super().__init__(fps)
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        self.fourcc = fourcc
+        self.ext = ext
+        self.segments = 0
+        self._writer = None
+        self._segment_start = None
+        self._frames = 0
+        self._session = time.strftime("%Y%m%d-%H%M%S")
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_segment(self, frame, timestamp):
+        self._close_segment()
+        self.segments += 1
+        path = os.path.join(self.directory, f"holosnake-{self._session}-{self.segments:03d}{self.ext}")
+        h, w = frame.shape[:2]
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (w, h))
+        if not self._writer.isOpened():
+            self._writer = None
+            raise IOError(f"could not open video file {path}")
+        self._segment_start = timestamp
+        self._frames = 0
+
+    def _close_segment(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+    def write(self, frame, timestamp):
+        if self._writer is None or timestamp - self._segment_start >= self.segment_seconds:
+            self._open_segment(frame, timestamp)
+        # repeat the frame to cover gaps, but never more than a second's worth
+        due = int((timestamp - self._segment_start) * self.fps) + 1
+        for _ in range(min(max(due - self._frames, 1), int(self.fps))):
+            self._writer.write(frame)
+            self._frames += 1
+
+    def close(self):
+        self._close_segment()
+
+
+class OutputFanout:
+    """Hands finished frames to sinks through a small pool of encoder workers.
+
+    publish() never copies and never blocks: the frame buffer is held in its
+    FramePool (see capture.py) until every sink that took it is done. A
+    sink that is still busy with an earlier frame misses this one (counted
+    in its `dropped`); frames beyond a sink's `fps` are left out on a
+    running schedule (counted in its `skipped`). Each sink has
+    at most one frame in flight, so the workers spread different sinks over
+    cores while every sink still sees its frames in order.
+    """
+
+    def __init__(self, sinks, workers=2):
+        self.sinks = list(sinks)
+        self.published = 0
+        self._jobs = queue.Queue()
+        self._warned = set()
+        self._workers = [threading.Thread(target=self._run, name=f"Encoder-{i}", daemon=True)
+                         for i in range(max(1, min(workers, len(self.sinks))))]
+        for worker in self._workers:
+            worker.start()
+
+    def publish(self, frame, timestamp, pool=None):
+        """Send `frame` to every sink that can take it now; `pool` owns the buffer.
+
+        A frame the pool does not own (or with no pool) is copied once before
+        it is handed out, since nothing would keep the caller from reusing it.
+        """
+        self.published += 1
+        copied = False
+        for sink in self.sinks:
+            if not sink.due(timestamp):
+                sink.skipped += 1
+                continue
+            if not sink.wants():
+                continue
+            if sink.busy:
+                sink.dropped += 1
+                continue
+            if not copied and (pool is None or not pool.hold(frame)):
+                frame, pool, copied = frame.copy(), None, True
+            sink.busy = True
+            self._jobs.put((sink, frame, timestamp, pool))
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            sink, frame, timestamp, pool = job
+            try:
+                sink.write(frame, timestamp)
+                sink.written += 1
+            except Exception as e:
+                if sink.name not in self._warned:
+                    self._warned.add(sink.name)
+                    print(f"[WARNING] Output {sink.name} failed:", e)
+            finally:
+                if pool is not None:
+                    pool.release(frame)
+                sink.busy = False
+
+    def describe(self):
+        return " ".join(f"{s.name}={s.written}/-{s.dropped}" for s in self.sinks)
+
+    def close(self):
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"[WARNING] Could not close output {sink.name}:", e)
@@ -0,0 +1,157 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+
+class StageProfiler:
+    """Lap timer for the stages of the main loop.
+
+    Call start_frame() at the top of every frame and lap("stage") after each
+    stage; the time since the previous lap is recorded for that stage. Each
+    stage keeps a rolling window of its last `window` samples, from which
+    p50/p95/p99 are computed only when a report is asked for. When disabled
+    every call returns immediately.
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, enabled=True, window=600, export_path=None, export_every=5.0, overlay=False,
+                 overlay_refresh=0.5):
+        self.enabled = enabled
+        self.window = window
+        self.export_path = export_path
+        self.export_every = export_every
+        self.overlay = overlay
+        self.overlay_refresh = overlay_refresh
+        self.info = {}          # extra "name: value" lines for the overlay and export
+
+        self.frames = 0
+        self._samples = {}      # stage -> (ring array in seconds, [count])
+        self._frame_start = None
+        self._last_lap = None
+        self._last_export = time.time()
+        self._overlay_lines = []
+        self._overlay_time = 0.0
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.record("frame", now - self._frame_start)
+            self.frames += 1
+        self._frame_start = self._last_lap = now
+
+    def lap(self, stage):
+        if not self.enabled or self._last_lap is None:
+            return
+        now = time.perf_counter()
+        self.record(stage, now - self._last_lap)
+        self._last_lap = now
+
+    def record(self, stage, seconds):
+        """Add a sample measured elsewhere (e.g. on a worker thread)."""
+        if not self.enabled:
+            return
+        entry = self._samples.get(stage)
+        if entry is None:
+            entry = self._samples[stage] = (np.zeros(self.window), [0])
+        ring, count = entry
+        ring[count[0] % self.window] = seconds
+        count[0] += 1
+
+    def summary(self):
+        """{stage: {"p50", "p95", "p99", "max" in ms, "n"}} over the rolling window."""
+        out = {}
+        for stage, (ring, count) in self._samples.items():
+            data = ring[:min(count[0], self.window)] * 1000.0
+            if not len(data):
+                continue
+            p50, p95, p99 = np.percentile(data, self.PERCENTILES)
+            out[stage] = {"p50": round(float(p50), 3), "p95": round(float(p95), 3),
+                          "p99": round(float(p99), 3), "max": round(float(data.max()), 3), "n": count[0]}
+        return out
+
+    def fps(self):
+        frame = self._samples.get("frame")
+        if frame is None or not frame[1][0]:
+            return 0.0
+        mean = frame[0][:min(frame[1][0], self.window)].mean()
+        return 1.0 / mean if mean > 0 else 0.0
+
+    def maybe_export(self, now=None):
+        """Append one JSON line with the current summary every `export_every` seconds."""
+        if not self.enabled or not self.export_path:
+            return
+        now = time.time() if now is None else now
+        if now - self._last_export < self.export_every:
+            return
+        self._last_export = now
+        line = {"t": round(now, 3), "frames": self.frames, "fps": round(self.fps(), 2), "stages": self.summary()}
+        line.update(self.info)
+        try:
+            with open(self.export_path, "a") as f:
+                f.write(json.dumps(line) + "\n")
+        except Exception as e:
+            print("[WARNING] Could not write profile export:", e)
+
+    def draw(self, img, now=None):
+        """Draw FPS and per-stage p50/p95 in the top-right corner, refreshed every `overlay_refresh` seconds."""
+        if not self.enabled or not self.overlay:
+            return img
+        now = time.time() if now is None else now
+        if now - self._overlay_time > self.overlay_refresh:
+            self._overlay_time = now
+            self._overlay_lines = [f"FPS {self.fps():5.1f}"]
+            self._overlay_lines += [f"{name} {value}" for name, value in self.info.items()]
+            for stage, stats in self.summary().items():
+                if stage != "frame":
+                    self._overlay_lines.append(f"{stage:<8}{stats['p50']:6.1f}{stats['p95']:6.1f} ms")
+        x = img.shape[1] - 300
+        for i, line in enumerate(self._overlay_lines):
+            y = 30 + i * 22
+            cv2.putText(img, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.3, (0, 0, 0), 3)
+            cv2.putText(img, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.3, (0, 255, 255), 1)
+        return img
+
+
+class StartupTimer:
+    """Wall-clock timing of named startup phases, which may run on different threads.
+
+    Wrap each phase in `with timer.phase("name"):`; report() prints when each
+    phase started and how long it took, relative to the timer's creation.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}        # name -> (start offset, duration) in seconds; duration None while running
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        begin = time.perf_counter()
+        with self._lock:
+            self.phases[name] = (begin - self.start, None)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = (begin - self.start, time.perf_counter() - begin)
+
+    def running(self):
+        with self._lock:
+            return [name for name, (_, duration) in self.phases.items() if duration is None]
+
+    def report(self):
+        total = time.perf_counter() - self.start
+        with self._lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1][0])
+        print(f"[INFO] Startup took {total * 1000:.0f} ms")
+        for name, (offset, duration) in phases:
+            took = "still running" if duration is None else f"{duration * 1000:7.0f} ms"
+            print(f"[INFO]   {name:<10} +{offset * 1000:6.0f} ms  {took}")
+        return total
@@ -0,0 +1,202 @@
+from collections import OrderedDict
+
+import cv2
+import cvzone
+import numpy as np
+
+
+class SnakeRenderer:
+    """Draws the whole snake body with batched cv2.polylines calls.
+
+    A plain body is one call. With `tail_color` set the body is shaded from
+    tail to head in `bands` color steps, one call per band, so the cost does
+    not grow with the snake's length. The head is a filled circle or, if given,
+    a BGRA sprite centered on the head point. `step` > 1 draws only every
+    step-th body point, a cheaper and slightly coarser outline.
+    """
+
+    def __init__(self, thickness=20, color=(0, 0, 255), tail_color=None, bands=8,
+                 head_color=(0, 255, 0), head_radius=20, head_sprite=None, step=1):
+        self.thickness = thickness
+        self.step = max(1, int(step))
+        self.color = color
+        self.tail_color = tail_color
+        self.bands = max(1, bands)
+        self.head_color = head_color
+        self.head_radius = head_radius
+        self.head_sprite = head_sprite
+        self._band_colors = self._gradient()
+
+    def _gradient(self):
+        if self.tail_color is None:
+            return [self.color]
+        tail = np.array(self.tail_color, dtype=np.float32)
+        head = np.array(self.color, dtype=np.float32)
+        steps = np.linspace(0.0, 1.0, self.bands)
+        return [tuple(int(c) for c in tail + (head - tail) * t) for t in steps]
+
+    def draw(self, img, points, head=None):
+        """Draw the body from an (n, 2) int32 point array, tail first.
+
+        `head` replaces the last point for display only (e.g. an interpolated head).
+        """
+        n = len(points)
+        if head is not None and n:
+            points = np.array(points, dtype=np.int32)
+            points[-1] = head
+        if n >= 2:
+            pts = np.ascontiguousarray(points, dtype=np.int32)
+            if self.step > 1 and n > 2:
+                # keep the head point so the body still meets the head
+                pts = np.concatenate((pts[:-1:self.step], pts[-1:]))
+            colors = self._band_colors
+            if len(colors) == 1:
+                cv2.polylines(img, [pts], False, colors[0], self.thickness)
+            else:
+                # neighbouring bands share an endpoint so the body stays connected
+                edges = np.linspace(0, len(pts) - 1, len(colors) + 1).astype(int)
+                for color, a, b in zip(colors, edges[:-1], edges[1:]):
+                    if b > a:
+                        cv2.polylines(img, [pts[a:b + 1]], False, color, self.thickness)
+        if n:
+            hx, hy = int(points[-1][0]), int(points[-1][1])
+            if self.head_sprite is not None:
+                h, w = self.head_sprite.shape[:2]
+                try:
+                    img = cvzone.overlayPNG(img, self.head_sprite, (hx - w // 2, hy - h // 2))
+                except Exception:
+                    pass
+            else:
+                cv2.circle(img, (hx, hy), self.head_radius, self.head_color, cv2.FILLED)
+        return img
+
+
+class LayerCompositor:
+    """Caches a set of BGRA sprites as one premultiplied-alpha overlay.
+
+    The overlay is rebuilt only when the caller's `key` changes (e.g. the wall,
+    obstacle and food positions); otherwise blend() applies it to the frame in
+    a single vectorized pass over the layer's bounding box.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.rebuilds = 0
+        self._shape = None
+        self._rect = None           # (x0, y0, x1, y1) covered by the layer
+        self._color = None          # premultiplied BGR, uint8
+        self._inv_alpha = None      # 255 - alpha, uint8, 3 channels
+
+    def stale(self, key, shape):
+        return key != self.key or shape[:2] != self._shape
+
+    def build(self, key, shape, sprites):
+        """Composite `sprites`, an iterable of (image, (x, y)), in painter's order.
+
+        Each image is a BGRA array or an assets.Sprite, whose precomputed
+        premultiplied color and alpha are used as is.
+        """
+        self.key = key
+        self._shape = shape[:2]
+        self.rebuilds += 1
+        h, w = self._shape
+        placed = []
+        for sprite, (x, y) in sprites:
+            sh, sw = sprite.shape[:2]
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + sw, w), min(y + sh, h)
+            if x1 > x0 and y1 > y0:
+                placed.append((sprite, (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x)), x0, y0, x1, y1))
+        if not placed:
+            self._rect = None
+            return
+        rx0 = min(p[2] for p in placed)
+        ry0 = min(p[3] for p in placed)
+        rx1 = max(p[4] for p in placed)
+        ry1 = max(p[5] for p in placed)
+        color = np.zeros((ry1 - ry0, rx1 - rx0, 3), dtype=np.float32)
+        alpha = np.zeros((ry1 - ry0, rx1 - rx0, 1), dtype=np.float32)
+        for sprite, crop, x0, y0, x1, y1 in placed:
+            if isinstance(sprite, np.ndarray):
+                a = sprite[crop + (slice(3, 4),)].astype(np.float32) / 255.0
+                premultiplied = sprite[crop + (slice(0, 3),)].astype(np.float32) * a
+            else:
+                a, premultiplied = sprite.alpha[crop], sprite.color[crop]
+            c = color[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+            m = alpha[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+            # "over" operator on premultiplied color
+            c *= 1.0 - a
+            c += premultiplied
+            m *= 1.0 - a
+            m += a
+        self._rect = (rx0, ry0, rx1, ry1)
+        self._color = np.clip(color + 0.5, 0, 255).astype(np.uint8)
+        inv = np.clip((1.0 - alpha) * 255.0 + 0.5, 0, 255).astype(np.uint8)
+        self._inv_alpha = np.repeat(inv, 3, axis=2)
+
+    def blend(self, img):
+        """Blend the cached layer onto `img` in place and return it."""
+        if self._rect is None:
+            return img
+        x0, y0, x1, y1 = self._rect
+        roi = img[y0:y1, x0:x1]
+        cv2.add(cv2.multiply(roi, self._inv_alpha, scale=1.0 / 255.0), self._color, dst=roi)
+        return img
+
+
+class TextSpriteCache:
+    """LRU cache of rasterized cvzone.putTextRect labels.
+
+    putTextRect() takes the same arguments as cvzone's and draws the same
+    pixels, but each distinct label is rasterized once and then blitted, so
+    static HUD and menu text costs a masked copy per frame.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._sprites = OrderedDict()
+
+    def _render(self, text, scale, thickness, colorT, colorR, font, offset, border, colorB):
+        (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+        # glyphs can spill past the background rect, so leave a margin around it
+        pad = thickness + baseline + 2
+        left, top = offset + pad, h + offset + pad
+        size = (top + offset + pad + baseline, left + w + offset + pad)
+        sprite = np.zeros(size + (3,), dtype=np.uint8)
+        mask = np.zeros(size, dtype=np.uint8)
+        p1, p2 = (left - offset, top + offset), (left + w + offset, top - h - offset)
+        for canvas, cr, ct, cb in ((sprite, colorR, colorT, colorB), (mask, 255, 255, 255)):
+            cv2.rectangle(canvas, p1, p2, cr, cv2.FILLED)
+            if border is not None:
+                cv2.rectangle(canvas, p1, p2, cb, border)
+            cv2.putText(canvas, text, (left, top), font, scale, ct, thickness)
+        return sprite, mask, left, top, (w, h)
+
+    def putTextRect(self, img, text, pos, scale=3, thickness=3, colorT=(255, 255, 255),
+                    colorR=(255, 0, 255), font=cv2.FONT_HERSHEY_PLAIN,
+                    offset=10, border=None, colorB=(0, 255, 0)):
+        key = (text, scale, thickness, tuple(colorT), tuple(colorR), font, offset, border, tuple(colorB))
+        entry = self._sprites.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._render(text, scale, thickness, tuple(colorT), tuple(colorR),
+                                 font, offset, border, tuple(colorB))
+            self._sprites[key] = entry
+            if len(self._sprites) > self.max_entries:
+                self._sprites.popitem(last=False)
+        else:
+            self.hits += 1
+            self._sprites.move_to_end(key)
+        sprite, mask, left, top, (w, h) = entry
+
+        ox, oy = int(pos[0]), int(pos[1])
+        x, y = ox - left, oy - top
+        sh, sw = mask.shape
+        ih, iw = img.shape[:2]
+        x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + sw, iw), min(y + sh, ih)
+        if x1 > x0 and y1 > y0:
+            roi = img[y0:y1, x0:x1]
+            cv2.copyTo(sprite[y0 - y:y1 - y, x0 - x:x1 - x], mask[y0 - y:y1 - y, x0 - x:x1 - x], roi)
+        return img, [ox - offset, oy - h - offset, ox + w + offset, oy + offset]
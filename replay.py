@@ -0,0 +1,180 @@
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+MAGIC = b"HSNKREC1"
+HEADER_SIZE = 64
+
+
+def _record_dtype(height, width, channels):
+    # one fixed-size record per frame: capture timestamp followed by raw BGR pixels
+    return np.dtype([("t", "<f8"), ("frame", np.uint8, (height, width, channels))])
+
+
+def _write_header(f, height, width, channels):
+    header = MAGIC + np.array([height, width, channels], dtype="<u4").tobytes()
+    f.write(header.ljust(HEADER_SIZE, b"\0"))
+
+
+def _read_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+        raise ValueError(f"Not a HOLOSNAKE recording: {path}")
+    height, width, channels = np.frombuffer(header, dtype="<u4", count=3, offset=len(MAGIC))
+    return int(height), int(width), int(channels)
+
+
+class FrameRecorder:
+    """Appends raw frames plus timestamps to a recording file on a writer thread.
+
+    write() only copies the frame into a bounded queue; if the disk falls
+    behind, frames are dropped (and counted) instead of stalling the caller.
+    """
+
+    def __init__(self, path, max_pending=8):
+        self.path = path
+        self.written = 0
+        self.dropped = 0
+        self._file = None
+        self._shape = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="FrameRecorder", daemon=True)
+        self._thread.start()
+
+    def write(self, frame, timestamp=None):
+        if self._shape is None:
+            self._shape = frame.shape
+        elif frame.shape != self._shape:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait((time.time() if timestamp is None else timestamp, frame.copy()))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            timestamp, frame = item
+            try:
+                if self._file is None:
+                    self._file = open(self.path, "wb")
+                    h, w = frame.shape[:2]
+                    _write_header(self._file, h, w, frame.shape[2] if frame.ndim == 3 else 1)
+                self._file.write(np.array([timestamp], dtype="<f8").tobytes())
+                self._file.write(np.ascontiguousarray(frame).tobytes())
+                self.written += 1
+            except Exception as e:
+                print("[WARNING] Could not write recorded frame:", e)
+        if self._file is not None:
+            self._file.close()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+
+
+class ReplayCapture:
+    """cv2.VideoCapture look-alike that serves frames from a FrameRecorder file.
+
+    The file is memory-mapped and read() returns read-only views into it, so
+    no frame is copied. With `realtime` the original capture timing is
+    reproduced; otherwise frames are served as fast as they are asked for.
+    """
+
+    def __init__(self, path, realtime=True, loop=False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.position = 0
+        self._records = self._frames = self._times = None
+        self._start_wall = None
+        self._first_t = 0.0
+        try:
+            height, width, channels = _read_header(path)
+            dtype = _record_dtype(height, width, channels)
+            count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+            if count > 0:
+                self._records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+                # field views into the mapping; indexing them never copies pixels
+                self._frames = self._records["frame"]
+                self._times = self._records["t"]
+        except Exception as e:
+            print(f"[WARNING] Could not open recording {path}: {e}")
+
+    def isOpened(self):
+        return self._records is not None
+
+    def __len__(self):
+        return 0 if self._records is None else len(self._records)
+
+    def read(self, image=None):
+        # `image` is accepted for VideoCapture compatibility but never written to
+        if self._records is None:
+            return False, None
+        if self.position >= len(self._records):
+            if not self.loop:
+                return False, None
+            self.position = 0
+            self._start_wall = None
+        if self.realtime:
+            t = float(self._times[self.position])
+            if self._start_wall is None:
+                self._start_wall, self._first_t = time.time(), t
+            delay = (t - self._first_t) - (time.time() - self._start_wall)
+            if delay > 0:
+                time.sleep(delay)
+        frame = self._frames[self.position]
+        self.position += 1
+        return True, frame
+
+    def timestamp(self, index=None):
+        index = self.position - 1 if index is None else index
+        return float(self._times[index])
+
+    def get(self, prop):
+        if self._records is None:
+            return 0.0
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self._records.dtype["frame"].shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self._records.dtype["frame"].shape[0])
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self._records))
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == cv2.CAP_PROP_FPS:
+            n = len(self._times)
+            span = float(self._times[n - 1] - self._times[0]) if n > 1 else 0.0
+            return (n - 1) / span if span > 0 else 0.0
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES and self._records is not None:
+            self.position = max(0, min(int(value), len(self._records)))
+            self._start_wall = None
+            return True
+        # resolution and the like are fixed by the recording
+        return False
+
+    def release(self):
+        self._records = self._frames = self._times = None
+
+
+def open_capture(source, width=1280, height=720, realtime=True, loop=True):
+    """Open a camera index ("0", 1, ...) or a recording file path."""
+    if isinstance(source, int) or str(source).isdigit():
+        cap = cv2.VideoCapture(int(source))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        return cap
+    return ReplayCapture(source, realtime=realtime, loop=loop)
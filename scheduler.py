@@ -0,0 +1,57 @@
+class FixedStepScheduler:
+    """Runs game logic at a fixed tick rate, independent of render and detection rates.
+
+    Each frame the loop calls advance(now) and, for each returned tick
+    timestamp, calls tick() and then runs one simulation step, then renders
+    with `alpha`, the fraction of a tick elapsed since the last step.
+    sim_time() is the simulation clock to hand to the game: tick() moves it
+    forward one tick at a time, so every step of a multi-tick frame sees its
+    own time and timers count ticks rather than wall time. Ticks a frame does
+    not step through (e.g. while paused) are counted by the next advance().
+    """
+
+    def __init__(self, tick_rate=30.0, max_steps=5):
+        self.dt = 1.0 / tick_rate
+        self.max_steps = max_steps
+        self.ticks = 0
+        self.alpha = 0.0
+        self.dropped_ticks = 0
+        self._pending = 0           # ticks returned by advance() not yet stepped through
+        self._accumulator = 0.0
+        self._last = None
+
+    def sim_time(self):
+        return self.ticks * self.dt
+
+    def reset(self, now):
+        """Start counting from `now` without catching up on time spent elsewhere (e.g. menus)."""
+        self._last = now
+        self._accumulator = 0.0
+        self._pending = 0
+        self.alpha = 0.0
+
+    def tick(self):
+        """Move sim_time() forward by one of the ticks returned by the last advance()."""
+        if self._pending:
+            self._pending -= 1
+            self.ticks += 1
+
+    def advance(self, now):
+        """Wall-clock timestamps of the ticks due by `now` (at most `max_steps`)."""
+        if self._last is None:
+            self._last = now
+        self.ticks += self._pending
+        self._accumulator += max(0.0, now - self._last)
+        self._last = now
+        due = int(self._accumulator / self.dt)
+        if due > self.max_steps:
+            # too far behind to catch up; skip the backlog instead of spiralling
+            self.dropped_ticks += due - self.max_steps
+            self._accumulator -= (due - self.max_steps) * self.dt
+            due = self.max_steps
+        start = now - self._accumulator
+        times = [start + (i + 1) * self.dt for i in range(due)]
+        self._accumulator -= due * self.dt
+        self._pending = due
+        self.alpha = self._accumulator / self.dt
+        return times
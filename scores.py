@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+
+SCORE_VERSION = 2
+
+
+def board_name(level, players=1):
+    """Leaderboard key: one board per level, and per player count for multi-player games."""
+    return f"level-{level}" if players <= 1 else f"level-{level}-{players}p"
+
+
+class ScoreStore:
+    """In-memory per-level leaderboards, persisted by a background writer.
+
+    The game only calls best() and record(), which touch memory under a lock
+    and return at once. record() wakes the writer thread, which waits
+    `delay` seconds so a burst of results becomes one write, then writes a
+    snapshot to a temporary file, fsyncs it and os.replace()s it over the
+    real file: a crash or power loss leaves either the old or the new file,
+    never a truncated one. Each board keeps its best `top` results and the
+    last `history` games.
+
+    The file is read once, by load() (called at startup) or by the first
+    best()/record(). A pre-leaderboard highscore.json ({"highScore": N}) is
+    imported as a level 1 result, the level the old game defaulted to.
+    """
+
+    def __init__(self, path, top=10, history=100, delay=0.5, clock=time.time):
+        self.path = path
+        self.top_size = top
+        self.history_size = history
+        self.delay = delay
+        self.clock = clock
+        self.writes = 0
+
+        self._boards = {}
+        self._loaded = False
+        self._dirty = 0             # bumped on every change; the writer saves up to a version
+        self._saved = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._closing = False
+        self._thread = None
+
+    # -- loading --------------------------------------------------------------
+    def load(self):
+        with self._lock:
+            self._load_locked()
+        return self
+
+    def _load_locked(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"[WARNING] Could not read scores from {self.path}: {e}")
+            self._keep_unreadable()
+            return
+        if "boards" in data:
+            for name, board in data["boards"].items():
+                self._boards[name] = {"top": list(board.get("top", [])), "history": list(board.get("history", []))}
+        elif "highScore" in data:
+            score = int(data["highScore"])
+            if score > 0:
+                entry = {"score": score, "time": None, "players": 1}
+                self._boards[board_name(1)] = {"top": [entry], "history": [entry]}
+                self._dirty += 1
+                self._wake_writer()
+
+    def _keep_unreadable(self):
+        # keep the damaged file for inspection instead of overwriting it on the next save
+        try:
+            os.replace(self.path, self.path + ".corrupt")
+        except OSError:
+            pass
+
+    # -- game-facing API (memory only) -----------------------------------------
+    def best(self, level, players=1):
+        with self._lock:
+            self._load_locked()
+            board = self._boards.get(board_name(level, players))
+            return board["top"][0]["score"] if board and board["top"] else 0
+
+    def leaderboard(self, level, players=1):
+        """Best results for a level as a list of {"score", "time", "players"}, highest first."""
+        with self._lock:
+            self._load_locked()
+            board = self._boards.get(board_name(level, players))
+            return [dict(e) for e in board["top"]] if board else []
+
+    def history(self, level, players=1):
+        """Most recent results for a level, oldest first."""
+        with self._lock:
+            self._load_locked()
+            board = self._boards.get(board_name(level, players))
+            return [dict(e) for e in board["history"]] if board else []
+
+    def record(self, level, score, players=1):
+        """Add a finished game's score; returns True if it is a new best for the level."""
+        entry = {"score": int(score), "time": round(self.clock(), 3), "players": players}
+        with self._lock:
+            self._load_locked()
+            board = self._boards.setdefault(board_name(level, players), {"top": [], "history": []})
+            is_best = not board["top"] or entry["score"] > board["top"][0]["score"]
+            board["history"].append(entry)
+            del board["history"][:-self.history_size]
+            top = board["top"]
+            # stable: among equal scores the earlier result stays ahead
+            idx = next((i for i, e in enumerate(top) if e["score"] < entry["score"]), len(top))
+            top.insert(idx, entry)
+            del top[self.top_size:]
+            self._dirty += 1
+            self._wake_writer()
+        return is_best
+
+    # -- writer -----------------------------------------------------------------
+    def _wake_writer(self):
+        # called with the lock held
+        if self._thread is None and not self._closing:
+            self._thread = threading.Thread(target=self._run, name="ScoreWriter", daemon=True)
+            self._thread.start()
+        self._changed.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._dirty == self._saved and not self._closing:
+                    self._changed.wait()
+                if self._dirty == self._saved:
+                    return
+                if not self._closing and self.delay > 0:
+                    # let a burst of results land before writing
+                    self._changed.wait(self.delay)
+                version = self._dirty
+                snapshot = {"version": SCORE_VERSION,
+                            "boards": {name: {"top": [dict(e) for e in b["top"]],
+                                              "history": [dict(e) for e in b["history"]]}
+                                       for name, b in self._boards.items()}}
+            saved = self._write(snapshot)
+            with self._lock:
+                # on failure, give up on this version; the next record() retries with fresh data
+                self._saved = version
+                if saved:
+                    self.writes += 1
+                self._changed.notify_all()
+
+    def _write(self, snapshot):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(snapshot, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            return True
+        except Exception as e:
+            print("[WARNING] Could not save scores:", e)
+            return False
+
+    def flush(self, timeout=2.0):
+        """Wait until everything recorded so far is on disk (or `timeout` passes)."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            target = self._dirty
+            self._changed.notify()
+            while self._saved < target and self._thread is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return True
+
+    def close(self, timeout=2.0):
+        """Write any pending results now and stop the writer thread."""
+        with self._lock:
+            self._closing = True
+            self._changed.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._lock:
+            self._thread = None
+            self._closing = False
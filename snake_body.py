@@ -0,0 +1,170 @@
+import numpy as np
+
+
+class SegmentHash:
+    """Spatial hash of body segments, keyed by the sequence number of their head end.
+
+    Segments are added as the snake grows. Ones trimmed off the tail are purged
+    lazily from the cells a query touches, plus a full sweep every few hundred
+    inserts, so both updates and queries only look at the local neighbourhood.
+    """
+
+    def __init__(self, cell_size=40, sweep_every=512):
+        self.cell_size = cell_size
+        self.sweep_every = sweep_every
+        self._cells = {}
+        self._since_sweep = 0
+
+    def clear(self):
+        self._cells.clear()
+        self._since_sweep = 0
+
+    def add(self, seq, p0, p1):
+        c = self.cell_size
+        for cx in range(min(p0[0], p1[0]) // c, max(p0[0], p1[0]) // c + 1):
+            for cy in range(min(p0[1], p1[1]) // c, max(p0[1], p1[1]) // c + 1):
+                self._cells.setdefault((cx, cy), []).append(seq)
+        self._since_sweep += 1
+
+    def sweep(self, lo):
+        """Drop segments with sequence numbers below `lo` from every cell."""
+        for key in list(self._cells):
+            kept = [s for s in self._cells[key] if s >= lo]
+            if kept:
+                self._cells[key] = kept
+            else:
+                del self._cells[key]
+        self._since_sweep = 0
+
+    def near(self, x, y, radius, lo, hi):
+        """Sequence numbers in [lo, hi] of segments in cells within `radius` of (x, y)."""
+        if self._since_sweep >= self.sweep_every:
+            self.sweep(lo)
+        c = self.cell_size
+        found = set()
+        for cx in range(int(x - radius) // c, int(x + radius) // c + 1):
+            for cy in range(int(y - radius) // c, int(y + radius) // c + 1):
+                bucket = self._cells.get((cx, cy))
+                if not bucket:
+                    continue
+                if bucket[0] < lo:
+                    # entries are appended in order, so expired ones sit at the front
+                    bucket[:] = [s for s in bucket if s >= lo]
+                for s in bucket:
+                    if s <= hi:
+                        found.add(s)
+        return found
+
+
+class SnakeBody:
+    """Snake body points and segment lengths in a preallocated NumPy ring buffer.
+
+    Every entry is written twice, at slot i and i + capacity, so the live body is
+    always one contiguous slice (tail first, head last) without copying.
+    """
+
+    def __init__(self, capacity=256, cell_size=40):
+        self.capacity = capacity
+        self._points = np.zeros((2 * capacity, 2), dtype=np.int32)
+        self._lengths = np.zeros(2 * capacity, dtype=np.float64)
+        self._start = 0         # slot of the tail
+        self.count = 0
+        self.total_length = 0.0
+        # every point ever appended gets a sequence number; the tail's is first_seq
+        self.first_seq = 0
+        self.segments = SegmentHash(cell_size)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self._start = 0
+        self.count = 0
+        self.total_length = 0.0
+        self.first_seq = 0
+        self.segments.clear()
+
+    def _grow(self):
+        points, lengths = self.points().copy(), self.lengths().copy()
+        self.capacity *= 2
+        self._points = np.zeros((2 * self.capacity, 2), dtype=np.int32)
+        self._lengths = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._points[:self.count] = points
+        self._lengths[:self.count] = lengths
+        self._start = 0
+
+    def append(self, x, y, length):
+        if self.count == self.capacity:
+            self._grow()
+        i = (self._start + self.count) % self.capacity
+        self._points[i] = self._points[i + self.capacity] = (x, y)
+        self._lengths[i] = self._lengths[i + self.capacity] = length
+        if self.count:
+            px, py = self._points[self._start + self.count - 1]
+            self.segments.add(self.first_seq + self.count, (int(px), int(py)), (int(x), int(y)))
+        self.count += 1
+        self.total_length += length
+
+    def points(self):
+        """(n, 2) int32 view of the body, tail first. Valid until the next append."""
+        return self._points[self._start:self._start + self.count]
+
+    def lengths(self):
+        return self._lengths[self._start:self._start + self.count]
+
+    def head(self):
+        return tuple(self._points[self._start + self.count - 1]) if self.count else None
+
+    def trim(self, allowed_length):
+        """Drop tail segments until the total length is below `allowed_length`.
+
+        The cut point comes from a cumulative sum over a window at the tail that
+        doubles only when needed, so the usual one-or-two-segment trim stays O(1).
+        """
+        excess = self.total_length - allowed_length
+        if excess <= 0 or not self.count:
+            return 0
+        lengths = self.lengths()
+        window = 16
+        while True:
+            window = min(window, self.count)
+            cumsum = np.cumsum(lengths[:window])
+            # first segment whose removal brings the total under the limit
+            cut = int(np.searchsorted(cumsum, excess, side="right"))
+            if cut < window or window == self.count:
+                break
+            window *= 4
+        removed = min(cut + 1, self.count)
+        self.total_length -= float(cumsum[removed - 1])
+        self._start = (self._start + removed) % self.capacity
+        self.count -= removed
+        self.first_seq += removed
+        if not self.count:
+            self.total_length = 0.0
+        return removed
+
+    def self_distance(self, x, y, radius, skip=2, half_thickness=0.0):
+        """Distance from (x, y) to the body surface, ignoring the last `skip` points.
+
+        Only segments hashed near the point are measured, so the cost depends on
+        how much body is close by rather than on its length. Returns None when
+        no segment centerline is within `radius`; with `half_thickness` set the
+        result is negative inside a thick body.
+        """
+        lo = self.first_seq + 1
+        hi = self.first_seq + self.count - 1 - skip
+        if hi < lo:
+            return None
+        seqs = self.segments.near(x, y, radius, lo, hi)
+        if not seqs:
+            return None
+        idx = np.fromiter(seqs, dtype=np.intp, count=len(seqs)) - self.first_seq + self._start
+        a = self._points[idx - 1].astype(np.float64)
+        ab = self._points[idx] - a
+        ap = np.array([x, y], dtype=np.float64) - a
+        denom = np.einsum("ij,ij->i", ab, ab)
+        t = np.clip(np.einsum("ij,ij->i", ap, ab) / np.maximum(denom, 1e-9), 0.0, 1.0)
+        d = np.hypot(*(ap - ab * t[:, None]).T).min()
+        if d > radius:
+            return None
+        return float(d) - half_thickness
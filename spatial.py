@@ -0,0 +1,161 @@
+import random
+
+import cv2
+import numpy as np
+
+
+class RectGrid:
+    """Uniform-grid index of axis-aligned rectangles (x0, y0, x1, y1).
+
+    Each rectangle is bucketed into every cell it touches, so point queries
+    only look at rectangles in nearby cells. Rectangles are added and removed
+    by key, which keeps updates incremental.
+    """
+
+    def __init__(self, cell_size=80):
+        self.cell_size = cell_size
+        self.rects = {}
+        self._cells = {}
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __contains__(self, key):
+        return key in self.rects
+
+    def _cell_range(self, rect):
+        c = self.cell_size
+        return range(rect[0] // c, (rect[2] - 1) // c + 1), range(rect[1] // c, (rect[3] - 1) // c + 1)
+
+    def clear(self):
+        self.rects.clear()
+        self._cells.clear()
+
+    def insert(self, key, rect):
+        if key in self.rects:
+            self.remove(key)
+        self.rects[key] = rect
+        xs, ys = self._cell_range(rect)
+        for cx in xs:
+            for cy in ys:
+                self._cells.setdefault((cx, cy), set()).add(key)
+
+    def remove(self, key):
+        rect = self.rects.pop(key, None)
+        if rect is None:
+            return
+        xs, ys = self._cell_range(rect)
+        for cx in xs:
+            for cy in ys:
+                bucket = self._cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._cells[(cx, cy)]
+
+    def hit(self, x, y):
+        """Key of a rectangle strictly containing point (x, y), or None."""
+        for key in self._cells.get((x // self.cell_size, y // self.cell_size), ()):
+            r = self.rects[key]
+            if r[0] < x < r[2] and r[1] < y < r[3]:
+                return key
+        return None
+
+
+class OccupancyMap:
+    """Per-pixel occupancy of the play field for sampling free sprite positions.
+
+    Blocked rectangles are counted into a bitmap. To place a w x h sprite the
+    free space is eroded by the sprite footprint, giving every valid top-left
+    corner at once, and a position is drawn uniformly from that flat index, so
+    placement is always valid and never retries.
+    """
+
+    def __init__(self, width=1280, height=720):
+        self.width = width
+        self.height = height
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        self.version = 0
+        self._free_cache = {}
+
+    def _clip(self, rect):
+        x0, y0, x1, y1 = rect
+        return max(x0, 0), max(y0, 0), min(x1, self.width), min(y1, self.height)
+
+    def clear(self):
+        self.counts[:] = 0
+        self._changed()
+
+    def load(self, counts):
+        """Replace the whole bitmap, e.g. with a precomputed layout's occupancy."""
+        np.copyto(self.counts, counts)
+        self._changed()
+
+    def add_rect(self, rect):
+        x0, y0, x1, y1 = self._clip(rect)
+        if x1 > x0 and y1 > y0:
+            self.counts[y0:y1, x0:x1] += 1
+        self._changed()
+
+    def remove_rect(self, rect):
+        x0, y0, x1, y1 = self._clip(rect)
+        if x1 > x0 and y1 > y0:
+            region = self.counts[y0:y1, x0:x1]
+            np.subtract(region, 1, out=region, where=region > 0)
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._free_cache.clear()
+
+    def _window(self, size, bounds):
+        """Clamp the top-left range so the sprite stays on the field."""
+        w, h = size
+        x0, y0 = max(bounds[0], 0), max(bounds[1], 0)
+        x1, y1 = min(bounds[2], self.width - w), min(bounds[3], self.height - h)
+        return x0, y0, x1, y1
+
+    @staticmethod
+    def _free_positions(region, size):
+        """Flat indices of top-left corners in `region` whose footprint is empty."""
+        w, h = size
+        # dilating with the footprint anchored at its top-left marks every corner
+        # whose w x h window touches an occupied pixel
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (w, h))
+        blocked = cv2.dilate(region, kernel, anchor=(0, 0), borderType=cv2.BORDER_CONSTANT, borderValue=0)
+        rows, cols = region.shape[0] - h + 1, region.shape[1] - w + 1
+        return np.flatnonzero(blocked[:rows, :cols] == 0)
+
+    def sample(self, size, bounds, rng=random, extra_rects=(), body=None, body_thickness=0):
+        """Top-left (x, y) for a `size` = (w, h) sprite that overlaps nothing, or None.
+
+        `bounds` = (x0, y0, x1, y1) is the inclusive range of top-left corners, as
+        for random.randint. `extra_rects` and the `body` polyline (or list of
+        polylines) are treated as occupied for this query only.
+        """
+        w, h = size
+        x0, y0, x1, y1 = self._window(size, bounds)
+        if x1 < x0 or y1 < y0:
+            return None
+        # only the pixels some candidate footprint can cover matter
+        region = self.counts[y0:y1 + h, x0:x1 + w]
+        if not extra_rects and body is None:
+            key = (size, bounds)
+            free = self._free_cache.get(key)
+            if free is None:
+                free = self._free_cache[key] = self._free_positions(region, size)
+        else:
+            region = region.copy()
+            for rx0, ry0, rx1, ry1 in extra_rects:
+                region[max(ry0 - y0, 0):max(ry1 - y0, 0), max(rx0 - x0, 0):max(rx1 - x0, 0)] = 1
+            polylines = body if isinstance(body, list) else [body]
+            offset = np.array([x0, y0], dtype=np.int32)
+            polylines = [np.asarray(pts, dtype=np.int32) - offset for pts in polylines if pts is not None and len(pts)]
+            if polylines:
+                cv2.polylines(region, polylines, False, 1, max(1, body_thickness))
+            free = self._free_positions(region, size)
+        if not len(free):
+            return None
+        idx = int(free[rng.randrange(len(free))])
+        cols = x1 - x0 + 1
+        return x0 + idx % cols, y0 + idx // cols
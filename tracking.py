@@ -0,0 +1,222 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class HandTracker:
+    """Runs HandDetector.findHands on a worker thread, off the game loop.
+
+    The loop hands over frames with submit(); only every `every_n`-th frame is
+    sent for inference, and frames arriving while the worker is busy are skipped.
+    Between results the index fingertip is extrapolated from the last two
+    detections so the snake keeps moving at display rate.
+
+    With a `roi_detector`, detection runs on a window cropped around the last
+    known fingertip (optionally downscaled by `roi_scale`) and falls back to
+    the full frame when the hand is not found there. The crops go through
+    their own detector, built with staticMode=True: `detector` tracks hands
+    from one call to the next, which only works when every call sees the
+    same full frame. The window only fits one hand, so it is not used when
+    tracking `max_hands` > 1: other players' hands would never be found.
+
+    With `mirror` the caller submits unflipped camera frames and every result
+    (landmarks, bbox, center, hand type, fingertip) is reported as if the
+    frame had been flipped horizontally, so the frame itself never is.
+    """
+
+    TIP_ID = 8
+    # landmark pairs MediaPipe draws as the hand skeleton (mp.solutions.hands.HAND_CONNECTIONS)
+    HAND_CONNECTIONS = ((0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8),
+                        (5, 9), (9, 10), (10, 11), (11, 12), (9, 13), (13, 14), (14, 15), (15, 16),
+                        (13, 17), (0, 17), (17, 18), (18, 19), (19, 20))
+
+    def __init__(self, detector, every_n=2, max_extrapolation=0.15, stale_after=0.5,
+                 roi_detector=None, roi_size=(480, 480), roi_scale=1.0, mirror=False, max_hands=1):
+        self.detector = detector
+        self.roi_detector = roi_detector
+        self.every_n = max(1, int(every_n))
+        self.max_extrapolation = max_extrapolation
+        self.stale_after = stale_after
+        self.roi = roi_detector is not None and max_hands == 1
+        self.roi_size = roi_size
+        self.roi_scale = roi_scale
+        self.mirror = mirror
+
+        self.frames_seen = 0
+        self.frames_submitted = 0
+        self.results = 0
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.last_inference_time = 0.0
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._input = None          # worker-owned copy of the submitted frame
+        self._input_time = 0.0
+        self._busy = False
+
+        self._hands = []
+        self._raw_hands = []        # detections in submitted-frame coordinates, for the ROI
+        self._result_time = 0.0
+        # (timestamp, (x, y)) of the two most recent index-tip detections
+        self._tip_prev = None
+        self._tip_last = None
+
+        self._thread = threading.Thread(target=self._run, name="HandTracker", daemon=True)
+        self._thread.start()
+
+    def submit(self, img, timestamp=None):
+        """Offer a frame for inference. Returns True if it was accepted."""
+        self.frames_seen += 1
+        if (self.frames_seen - 1) % self.every_n:
+            return False
+        with self._lock:
+            if self._busy:
+                return False
+            if self._input is None or self._input.shape != img.shape:
+                self._input = np.empty_like(img)
+            np.copyto(self._input, img)
+            self._input_time = time.time() if timestamp is None else timestamp
+            self._busy = True
+        self.frames_submitted += 1
+        self._wake.set()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._wake.wait(0.1):
+                continue
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            with self._lock:
+                img, stamp = self._input, self._input_time
+            start = time.time()
+            try:
+                hands = self._detect(img)
+            except Exception as e:
+                print("[WARNING] Hand detection failed:", e)
+                hands = []
+            elapsed = time.time() - start
+            with self._lock:
+                self._store(hands, stamp, img.shape[1])
+                self.last_inference_time = elapsed
+                self._busy = False
+
+    def _detect(self, img):
+        window = self._roi_window(img.shape) if self.roi else None
+        if window is not None:
+            x0, y0, x1, y1 = window
+            crop = img[y0:y1, x0:x1]
+            scale = self.roi_scale
+            if scale != 1.0:
+                crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            hands, _ = self.roi_detector.findHands(crop, draw=False, flipType=False)
+            if hands:
+                self.roi_hits += 1
+                return [self._to_frame(hand, x0, y0, scale) for hand in hands]
+            self.roi_misses += 1
+        hands, _ = self.detector.findHands(img, draw=False, flipType=False)
+        return hands
+
+    def _roi_window(self, shape):
+        """Crop rectangle around the last fingertip, large enough for the whole last hand."""
+        with self._lock:
+            hand = self._raw_hands[0] if self._raw_hands else None
+        if hand is None:
+            return None
+        h, w = shape[0], shape[1]
+        cx, cy = hand["lmList"][self.TIP_ID][0:2]
+        _, _, bw, bh = hand["bbox"]
+        rw = min(w, max(self.roi_size[0], 2 * bw + 80))
+        rh = min(h, max(self.roi_size[1], 2 * bh + 80))
+        x0 = int(min(max(cx - rw // 2, 0), w - rw))
+        y0 = int(min(max(cy - rh // 2, 0), h - rh))
+        if rw >= w and rh >= h:
+            return None
+        return x0, y0, x0 + rw, y0 + rh
+
+    @staticmethod
+    def _to_frame(hand, x0, y0, scale):
+        # map crop-space landmarks back into full-frame pixels
+        inv = 1.0 / scale
+        hand = dict(hand)
+        hand["lmList"] = [[int(x * inv) + x0, int(y * inv) + y0] + list(rest)
+                          for x, y, *rest in hand["lmList"]]
+        bx, by, bw, bh = hand["bbox"]
+        hand["bbox"] = (int(bx * inv) + x0, int(by * inv) + y0, int(bw * inv), int(bh * inv))
+        if "center" in hand:
+            hand["center"] = (int(hand["center"][0] * inv) + x0, int(hand["center"][1] * inv) + y0)
+        return hand
+
+    @staticmethod
+    def _mirrored(hand, width):
+        hand = dict(hand)
+        hand["lmList"] = [[width - 1 - x, y] + list(rest) for x, y, *rest in hand["lmList"]]
+        bx, by, bw, bh = hand["bbox"]
+        hand["bbox"] = (width - bx - bw, by, bw, bh)
+        if "center" in hand:
+            hand["center"] = (width - 1 - hand["center"][0], hand["center"][1])
+        if "type" in hand:
+            hand["type"] = {"Left": "Right", "Right": "Left"}.get(hand["type"], hand["type"])
+        return hand
+
+    def _store(self, hands, stamp, width):
+        self._raw_hands = hands
+        if self.mirror:
+            hands = [self._mirrored(hand, width) for hand in hands]
+        self._hands = hands
+        self._result_time = stamp
+        self.results += 1
+        if hands:
+            tip = tuple(hands[0]["lmList"][self.TIP_ID][0:2])
+            self._tip_prev = self._tip_last
+            self._tip_last = (stamp, tip)
+        else:
+            self._tip_prev = self._tip_last = None
+
+    def hands(self, now=None):
+        """Most recent detection result, or [] once it is older than `stale_after`."""
+        now = time.time() if now is None else now
+        with self._lock:
+            if now - self._result_time > self.stale_after:
+                return []
+            return self._hands
+
+    def index_tip(self, now=None):
+        """Index fingertip at time `now`, extrapolated from the last two detections."""
+        now = time.time() if now is None else now
+        with self._lock:
+            last, prev = self._tip_last, self._tip_prev
+        if last is None or now - last[0] > self.stale_after:
+            return None
+        t1, (x1, y1) = last
+        if prev is None or t1 <= prev[0]:
+            return [x1, y1]
+        t0, (x0, y0) = prev
+        ahead = min(max(now - t1, 0.0), self.max_extrapolation)
+        k = ahead / (t1 - t0)
+        return [int(x1 + (x1 - x0) * k), int(y1 + (y1 - y0) * k)]
+
+    def draw(self, img, hands):
+        """Draw what findHands(draw=True) would have: landmark skeleton, bbox and center dot."""
+        for hand in hands:
+            points = [(int(x), int(y)) for x, y, *_ in hand["lmList"]]
+            if len(points) == 21:
+                cv2.polylines(img, [np.array((points[a], points[b])) for a, b in self.HAND_CONNECTIONS],
+                              False, (224, 224, 224), 2)
+            for point in points:
+                cv2.circle(img, point, 3, (0, 0, 255), -1)
+            x, y, w, h = hand["bbox"]
+            cv2.rectangle(img, (x - 20, y - 20), (x + w + 20, y + h + 20), (255, 0, 255), 2)
+            cx, cy = hand.get("center", (x + w // 2, y + h // 2))
+            cv2.circle(img, (int(cx), int(cy)), 5, (0, 255, 0), -1)
+        return img
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=1.0)